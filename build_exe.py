@@ -5,16 +5,24 @@
 # - packaging
 # - prompt-toolkit
 # - rich
+# - tiktoken
+# - orjson（可选，加速历史记录保存）
 
 # 安装方法（命令行执行）:
 # pip install -r requirements.txt
-# 或者手动安装: pip install pyinstaller pyyaml openai packaging prompt-toolkit rich
+# 或者手动安装: pip install pyinstaller pyyaml openai packaging prompt-toolkit rich tiktoken orjson
 import os
 import sys
 import subprocess
 import shutil
-import pkg_resources
 import re
+import glob
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import distribution, PackageNotFoundError
+
+# main.py中VERSION变量的匹配规则
+_VERSION_RE = re.compile(r'''VERSION\s*=\s*["']([^"']+)["']''')
 
 def get_version_from_main():
     """从main.py中提取版本信息"""
@@ -22,18 +30,9 @@ def get_version_from_main():
         with open('main.py', 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # 使用简单的方法解析版本
-        for line in content.split('\n'):
-            if 'VERSION' in line and '=' in line:
-                # 提取引号中的内容
-                if '"' in line:
-                    parts = line.split('"')
-                    if len(parts) >= 2:
-                        return parts[1]
-                elif "'" in line:
-                    parts = line.split("'")
-                    if len(parts) >= 2:
-                        return parts[1]
+        match = _VERSION_RE.search(content)
+        if match:
+            return match.group(1)
         
         print("警告: 未在main.py中找到VERSION变量，使用默认版本1.0.0")
         return "1.0.0"
@@ -93,14 +92,70 @@ VarFileInfo([VarStruct(u'Translation', [1033, 1200])])
     print(f"已创建版本信息文件，版本: {version}")
     return 'version_info.txt'
 
-def check_and_install(package):
+# 构建所需的依赖包
+REQUIRED_PACKAGES = [
+    "packaging",
+    "pyinstaller",
+    "pyyaml",
+    "openai",
+    "prompt-toolkit",
+    "rich",
+    "tiktoken",
+    "orjson",
+]
+
+def _is_installed(package):
+    """检测单个依赖包是否已安装"""
+    try:
+        distribution(package)
+        return True
+    except PackageNotFoundError:
+        return False
+
+def ensure_dependencies(packages):
+    """并发检测依赖，并将缺失的包合并为一次pip安装"""
+    with ThreadPoolExecutor(max_workers=len(packages)) as executor:
+        installed = list(executor.map(_is_installed, packages))
+    
+    missing = [pkg for pkg, ok in zip(packages, installed) if not ok]
+    if not missing:
+        return
+    
+    print(f"未检测到 {', '.join(missing)}，正在安装...")
     try:
-        pkg_resources.get_distribution(package)
-    except pkg_resources.DistributionNotFound:
-        print(f"未检测到 {package}，正在安装...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
     except Exception as e:
-        print(f"检测/安装 {package} 失败: {e}")
+        print(f"检测/安装 {', '.join(missing)} 失败: {e}")
+
+# 构建输入哈希的保存位置
+INPUTS_HASH_FILE = os.path.join("build", ".inputs.sha")
+
+def compute_inputs_hash():
+    """计算构建输入（源码、语言文件、依赖列表）的哈希值"""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob("*.py") + glob.glob(os.path.join("i18n", "*.json"))):
+        digest.update(path.encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    digest.update("\n".join(REQUIRED_PACKAGES).encode('utf-8'))
+    return digest.hexdigest()
+
+def is_build_up_to_date(inputs_hash):
+    """判断上次构建的输入是否未变化且产物仍然存在"""
+    exe_name = "octool_cli.exe" if sys.platform == "win32" else "octool_cli"
+    if not os.path.exists(os.path.join("dist", "octool_cli", exe_name)):
+        return False
+    try:
+        with open(INPUTS_HASH_FILE, 'r', encoding='utf-8') as f:
+            return f.read().strip() == inputs_hash
+    except OSError:
+        return False
+
+def save_inputs_hash(inputs_hash):
+    """记录本次构建的输入哈希"""
+    os.makedirs(os.path.dirname(INPUTS_HASH_FILE), exist_ok=True)
+    with open(INPUTS_HASH_FILE, 'w', encoding='utf-8') as f:
+        f.write(inputs_hash)
 
 def clean_build_dirs():
     for d in ["build", "dist"]:
@@ -115,7 +170,7 @@ def clean_build_dirs():
             print(f"正在删除文件: {file}")
             os.remove(file)
 
-def build_exe():
+def build_exe(clean=True):
     print("正在使用 PyInstaller 构建可执行文件...")
     
     # 获取版本信息并创建版本文件
@@ -125,7 +180,8 @@ def build_exe():
     cmd = [
         sys.executable, "-m", "PyInstaller",
         "--onedir",
-        "--clean",
+        # 增量构建时保留PyInstaller的分析缓存，并直接覆盖旧产物
+        "--clean" if clean else "--noconfirm",
         "--name", "octool_cli",
         "--version-file", version_file,
         "--hidden-import", "yaml",
@@ -134,6 +190,13 @@ def build_exe():
         "--hidden-import", "prompt_toolkit",
         "--hidden-import", "prompt_toolkit.key_binding",
         "--hidden-import", "prompt_toolkit.shortcuts",
+        # main.py通过lazy_import按需加载这些模块，静态分析看不到，需显式声明
+        "--hidden-import", "markdown_renderer",
+        "--hidden-import", "rich.console",
+        "--hidden-import", "rich.markdown",
+        "--hidden-import", "rich.panel",
+        "--hidden-import", "rich.text",
+        "--hidden-import", "rich.live",
         "--hidden-import", "tiktoken",
         "--hidden-import", "tiktoken.registry",
         "--hidden-import", "tiktoken.model",
@@ -147,15 +210,16 @@ def build_exe():
 
 if __name__ == "__main__":
     # 检查依赖
-    check_and_install("packaging")
-    check_and_install("pyinstaller")
-    check_and_install("pyyaml")
-    check_and_install("openai")
-    check_and_install("prompt-toolkit")
-    check_and_install("rich")
-    check_and_install("tiktoken")
-    # 清理旧目录
-    clean_build_dirs()
+    ensure_dependencies(REQUIRED_PACKAGES)
+    # 输入未变化时跳过清理，复用上次的构建缓存
+    inputs_hash = compute_inputs_hash()
+    up_to_date = is_build_up_to_date(inputs_hash)
+    if up_to_date:
+        print("构建输入未变化，跳过清理，进行增量构建")
+    else:
+        # 清理旧目录
+        clean_build_dirs()
     # 构建
-    build_exe()
+    build_exe(clean=not up_to_date)
+    save_inputs_hash(inputs_hash)
     print("构建完成！可执行文件在 dist/octool_cli 目录下。")
\ No newline at end of file
@@ -6,13 +6,56 @@
 """
 
 import os
+import glob
 import json
-import uuid
+import secrets
+import threading
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 import tiktoken
 from i18n import t
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 历史记录文件扩展名：当前为JSON Lines格式，旧版为单个JSON文档
+HISTORY_EXT = ".jsonl"
+LEGACY_HISTORY_EXT = ".json"
+HISTORY_EXTENSIONS = (HISTORY_EXT, LEGACY_HISTORY_EXT)
+
+
+def _dumps_line(data: Dict[str, Any]) -> bytes:
+    """将对象序列化为以换行结尾的单行JSON（UTF-8字节）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data, ensure_ascii=False) + "\n").encode('utf-8')
+
+def _loads(data: bytes) -> Any:
+    """解析JSON（UTF-8字节）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _make_session_id() -> str:
+    """生成会话ID"""
+    return f"sess_{datetime.now():%Y%m%d_%H%M%S}_{secrets.token_hex(4)}"
+
+
+@lru_cache(maxsize=4)
+def _get_encoder(model: str):
+    """获取并缓存指定模型的tokenizer，所有会话共享同一实例"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # 如果模型不支持，使用默认编码
+        return tiktoken.get_encoding("cl100k_base")
+
+
 class ChatHistory:
     """聊天历史记录管理类"""
     
@@ -28,43 +71,156 @@ class ChatHistory:
         self.history_dir = history_dir
         self.session_id = self._generate_session_id()
         self.messages = []
+        self._api_messages = []  # 与messages对应的API消息格式缓存
         self.total_tokens = 0
         self.model = "deepseek-chat"
         self.created_at = datetime.now().isoformat()
         
+        # 增量保存状态：消息逐行追加到文件，整体替换后才重写文件
+        self._fp = None
+        self._filepath: Optional[str] = None
+        self._needs_rewrite = False
+        self._legacy_filepath: Optional[str] = None  # 已加载的旧格式文件，新格式写出后删除
+        
+        # 后台保存状态：只保留最新一份待写入的快照，文件操作统一由_io_lock串行化
+        self._io_lock = threading.Lock()
+        self._pending_rewrite: Optional[Tuple[str, bytes]] = None  # (文件路径, 完整文件内容)
+        self._writer: Optional[threading.Thread] = None
+        
         # 确保历史记录目录存在
         os.makedirs(history_dir, exist_ok=True)
         
-        # 初始化tokenizer
-        try:
-            self.tokenizer = tiktoken.encoding_for_model("gpt-3.5-turbo")
-        except:
-            # 如果模型不支持，使用默认编码
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        # 初始化tokenizer（模块级缓存）
+        self.tokenizer = _get_encoder(self.model)
     
     def _generate_session_id(self) -> str:
         """生成会话ID"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        return f"sess_{timestamp}_{unique_id}"
+        return _make_session_id()
     
     def _get_history_filename(self) -> str:
         """获取历史记录文件名"""
         date_str = datetime.now().strftime("%y%m%d")
-        return f"{date_str}-{self.config_id}-{self.session_id}.json"
+        return f"{date_str}-{self.config_id}-{self.session_id}{HISTORY_EXT}"
     
     def _get_history_filepath(self) -> str:
         """获取历史记录文件完整路径"""
         filename = self._get_history_filename()
         return os.path.join(self.history_dir, filename)
     
+    def _get_header(self) -> Dict[str, Any]:
+        """获取历史记录文件首行的会话信息"""
+        return {
+            "model": self.model,
+            "created_at": self.created_at,
+            "session_id": self.session_id,
+            "config_id": self.config_id
+        }
+    
+    def _append_to_file(self, messages: List[Dict[str, Any]]) -> None:
+        """将新消息逐行追加到历史记录文件"""
+        if self._needs_rewrite:
+            # 等待下次保存时整体重写，届时会包含这些消息
+            return
+        
+        if self._fp is None and all(msg.get("role") == "system" for msg in self.messages):
+            # 只有system消息时推迟创建文件，避免每次启动或切换配置都留下没有对话的文件
+            return
+        
+        with self._io_lock:
+            try:
+                # 后台快照尚未写出时先写出，保证追加顺序正确
+                self._flush_pending()
+                if self._fp is None:
+                    # 首次写入时创建文件，连同此前推迟写入的消息一起写出
+                    self._filepath = self._filepath or self._get_history_filepath()
+                    self._write_whole_file(self._filepath, self._serialize())
+                else:
+                    self._fp.write(b"".join(_dumps_line(msg) for msg in messages))
+                self._fp.flush()
+            except Exception as e:
+                print(f"{t('history.save_failed', error=str(e))}")
+                self._close_file()
+                self._needs_rewrite = True
+    
+    def _close_file(self) -> None:
+        """关闭历史记录文件句柄"""
+        if self._fp is not None:
+            try:
+                self._fp.close()
+            finally:
+                self._fp = None
+    
+    def _serialize(self) -> bytes:
+        """将会话信息和全部消息序列化为完整的文件内容"""
+        lines = [_dumps_line(self._get_header())]
+        lines.extend(_dumps_line(msg) for msg in self.messages)
+        return b"".join(lines)
+    
+    def _write_whole_file(self, filepath: str, data: bytes) -> None:
+        """整体写入历史记录文件并重新打开用于追加（调用方需持有_io_lock）"""
+        self._close_file()
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        self._fp = open(filepath, 'ab')
+        
+        # 旧格式文件已迁移为新格式，删除以免同一会话在列表中出现两次
+        if self._legacy_filepath is not None:
+            try:
+                os.remove(self._legacy_filepath)
+            except OSError:
+                pass
+            self._legacy_filepath = None
+    
+    def _flush_pending(self) -> None:
+        """写出尚未由后台线程处理的快照（调用方需持有_io_lock）"""
+        pending = self._pending_rewrite
+        if pending is not None:
+            self._pending_rewrite = None
+            self._write_whole_file(*pending)
+    
+    def _wait_pending(self) -> None:
+        """等待正在进行的后台写入，并写出剩余的快照"""
+        with self._io_lock:
+            self._flush_pending()
+    
+    def _rewrite_file(self) -> None:
+        """按当前消息列表整体重写历史记录文件"""
+        filepath = self._filepath or self._get_history_filepath()
+        data = self._serialize()
+        
+        with self._io_lock:
+            # 当前内容比任何待写快照都新，直接覆盖
+            self._pending_rewrite = None
+            self._write_whole_file(filepath, data)
+        
+        self._filepath = filepath
+        self._needs_rewrite = False
+    
+    def _background_writer(self) -> None:
+        """后台写入线程：持续写出最新快照，直到没有待写内容"""
+        while True:
+            with self._io_lock:
+                if self._pending_rewrite is None:
+                    self._writer = None
+                    return
+                try:
+                    self._flush_pending()
+                except Exception as e:
+                    print(f"{t('history.save_failed', error=str(e))}")
+                    self._close_file()
+                    self._needs_rewrite = True
+    
     def _count_tokens(self, text: str) -> int:
         """计算文本的Token数量"""
-        try:
-            return len(self.tokenizer.encode(str(text)))
-        except Exception:
-            # 如果编码失败，使用简单估算（1个Token约4个字符）
-            return len(str(text)) // 4 + 1
+        # 允许特殊标记作为普通文本编码，避免encode抛出异常
+        return len(self.tokenizer.encode(str(text), disallowed_special=()))
+    
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """批量计算多段文本的Token数量（在tiktoken内部并行编码）"""
+        if not texts:
+            return []
+        encoded = self.tokenizer.encode_batch([str(text) for text in texts], disallowed_special=())
+        return [len(tokens) for tokens in encoded]
     
     def add_message(self, role: str, content: str, message_type: str = "original") -> str:
         """
@@ -91,7 +247,9 @@ class ChatHistory:
         }
         
         self.messages.append(message)
+        self._api_messages.append({"role": role, "content": content})
         self.total_tokens += tokens
+        self._append_to_file([message])
         
         return message_id
     
@@ -100,15 +258,36 @@ class ChatHistory:
         获取用于API调用的消息格式
         
         Returns:
-            适用于OpenAI API的消息列表
+            适用于OpenAI API的消息列表（内部缓存，调用方不应修改）
         """
-        api_messages = []
-        for msg in self.messages:
-            api_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-        return api_messages
+        return self._api_messages
+    
+    def _rebuild_api_messages(self) -> None:
+        """根据messages重建API消息格式缓存"""
+        self._api_messages = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in self.messages
+        ]
+    
+    def replace_messages(self, messages: List[Dict[str, Any]], total_tokens: Optional[int] = None) -> None:
+        """
+        替换全部消息（如总结后），并同步Token统计和API消息缓存
+        
+        Args:
+            messages: 新的消息列表
+            total_tokens: 新消息的Token总数，已知时传入可避免重新求和
+        """
+        self.messages = messages
+        if total_tokens is None:
+            total_tokens = sum(msg.get("tokens", 0) for msg in messages)
+        self.total_tokens = total_tokens
+        self._rebuild_api_messages()
+        self._needs_rewrite = True
+    
+    @property
+    def is_dirty(self) -> bool:
+        """是否有尚未写入文件的修改（新消息在添加时已追加，只有整体重写会被推迟）"""
+        return self._needs_rewrite
     
     def get_total_tokens(self) -> int:
         """获取总Token数量"""
@@ -152,19 +331,23 @@ class ChatHistory:
             return 0
         
         # 保留system消息和最近的消息
-        system_messages = [msg for msg in self.messages if msg["role"] == "system"]
-        non_system_messages = [msg for msg in self.messages if msg["role"] != "system"]
+        system_messages, non_system_messages = [], []
+        for msg in self.messages:
+            (system_messages if msg["role"] == "system" else non_system_messages).append(msg)
         
         if len(non_system_messages) <= keep_recent:
             return 0
         
         # 计算需要移除的消息数量
         remove_count = len(non_system_messages) - keep_recent
+        removed_messages = non_system_messages[:remove_count]
         kept_messages = non_system_messages[remove_count:]
         
-        # 重新计算Token数量
+        # 只扣除被移除消息的Token数量
         self.messages = system_messages + kept_messages
-        self.total_tokens = sum(msg["tokens"] for msg in self.messages)
+        self.total_tokens -= sum(msg["tokens"] for msg in removed_messages)
+        self._rebuild_api_messages()
+        self._needs_rewrite = True
         
         return remove_count
     
@@ -172,32 +355,61 @@ class ChatHistory:
         """
         保存历史记录到文件
         
+        新消息在添加时已逐行追加，这里只需刷新缓冲；
+        消息被整体替换（总结、裁剪、加载）后才会重写整个文件。
+        
         Returns:
             是否保存成功
         """
         try:
-            history_data = {
-                "model": self.model,
-                "created_at": self.created_at,
-                "session_id": self.session_id,
-                "config_id": self.config_id,
-                "total_tokens": self.total_tokens,
-                "messages": self.messages
-            }
-            
-            filepath = self._get_history_filepath()
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(history_data, f, ensure_ascii=False, indent=2)
+            if self._needs_rewrite:
+                self._rewrite_file()
+            else:
+                self._wait_pending()
+                if self._fp is not None:
+                    self._fp.flush()
             
             return True
         except Exception as e:
             print(f"{t('history.save_failed', error=str(e))}")
             return False
     
+    def save_in_background(self) -> None:
+        """
+        在后台线程中保存历史记录
+        
+        序列化在调用线程完成，磁盘写入交给后台线程；
+        写入完成前再次调用时只保留最新的快照。
+        """
+        if not self._needs_rewrite:
+            return
+        
+        filepath = self._filepath or self._get_history_filepath()
+        data = self._serialize()
+        
+        with self._io_lock:
+            self._pending_rewrite = (filepath, data)
+            self._filepath = filepath
+            self._needs_rewrite = False
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._background_writer, daemon=True)
+                self._writer.start()
+    
+    def _find_session_file(self, session_id: str) -> Optional[str]:
+        """查找包含指定会话ID的历史记录文件，优先使用新格式"""
+        escaped = glob.escape(session_id)
+        for ext in HISTORY_EXTENSIONS:
+            matches = glob.glob(os.path.join(self.history_dir, f"*{escaped}*{ext}"))
+            if matches:
+                return matches[0]
+        return None
+    
     def load_from_file(self, session_id_or_filepath: str) -> bool:
         """
         从文件加载历史记录
         
+        支持JSON Lines格式和旧版JSON格式，加载后在下次保存时以新格式写出。
+        
         Args:
             session_id_or_filepath: 会话ID或历史记录文件路径
             
@@ -206,33 +418,50 @@ class ChatHistory:
         """
         try:
             # 如果是会话ID，需要查找对应的文件
-            if not session_id_or_filepath.endswith('.json'):
-                # 查找包含该会话ID的文件
-                found_file = None
-                if os.path.exists(self.history_dir):
-                    for filename in os.listdir(self.history_dir):
-                        if session_id_or_filepath in filename and filename.endswith('.json'):
-                            found_file = os.path.join(self.history_dir, filename)
-                            break
+            if not session_id_or_filepath.endswith(HISTORY_EXTENSIONS):
+                filepath = self._find_session_file(session_id_or_filepath)
                 
-                if not found_file:
+                if not filepath:
                     print(f"{t('history.session_file_not_found', session_id=session_id_or_filepath)}")
                     return False
-                
-                filepath = found_file
             else:
                 filepath = session_id_or_filepath
             
-            with open(filepath, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
+            with open(filepath, 'rb') as f:
+                if filepath.endswith(HISTORY_EXT):
+                    # 首行为会话信息，其余每行一条消息
+                    history_data = _loads(f.readline() or b"{}")
+                    history_data["messages"] = [_loads(line) for line in f if line.strip()]
+                else:
+                    history_data = _loads(f.read())
             
+            self._wait_pending()
+            self._close_file()
             self.model = history_data.get("model", "deepseek-chat")
             self.created_at = history_data.get("created_at", datetime.now().isoformat())
             self.session_id = history_data.get("session_id", self._generate_session_id())
             self.config_id = history_data.get("config_id", self.config_id)
-            self.total_tokens = history_data.get("total_tokens", 0)
             self.messages = history_data.get("messages", [])
             
+            # 旧版文件可能缺少Token统计，批量补齐
+            untokenized = [msg for msg in self.messages if "tokens" not in msg]
+            if untokenized:
+                counts = self._count_tokens_batch([msg.get("content", "") for msg in untokenized])
+                for msg, tokens in zip(untokenized, counts):
+                    msg["tokens"] = tokens
+            self.total_tokens = sum(msg["tokens"] for msg in self.messages)
+            
+            self._rebuild_api_messages()
+            
+            # 下次保存时整体写出：新格式文件原地重写，旧格式文件迁移为新格式后删除
+            if filepath.endswith(HISTORY_EXT):
+                self._filepath = filepath
+                self._legacy_filepath = None
+            else:
+                self._filepath = None
+                self._legacy_filepath = filepath
+            self._needs_rewrite = True
+            
             return True
         except Exception as e:
             print(f"{t('history.load_failed', error=str(e))}")
@@ -254,11 +483,10 @@ class ChatHistory:
             
             # 获取所有历史记录文件
             files = []
-            for filename in os.listdir(self.history_dir):
-                if filename.endswith('.json') and self.config_id in filename:
-                    filepath = os.path.join(self.history_dir, filename)
-                    mtime = os.path.getmtime(filepath)
-                    files.append((filepath, mtime))
+            with os.scandir(self.history_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(HISTORY_EXTENSIONS) and self.config_id in entry.name:
+                        files.append((entry.path, entry.stat().st_mtime))
             
             # 按修改时间排序，最新的在前
             files.sort(key=lambda x: x[1], reverse=True)
@@ -278,10 +506,16 @@ class ChatHistory:
         # 保存当前会话
         if self.messages:
             self.save_to_file()
+        self._wait_pending()
+        self._close_file()
+        self._filepath = None
+        self._needs_rewrite = False
+        self._legacy_filepath = None
         
         # 重置会话状态
         self.session_id = self._generate_session_id()
         self.messages = []
+        self._api_messages = []
         self.total_tokens = 0
         self.created_at = datetime.now().isoformat()
         
@@ -321,16 +555,17 @@ def get_recent_history_files(history_dir: str, limit: int = 10) -> List[tuple]:
         
         # 获取所有历史记录文件
         files = []
-        for filename in os.listdir(history_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(history_dir, filename)
-                mtime = os.path.getmtime(filepath)
+        with os.scandir(history_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(HISTORY_EXTENSIONS):
+                    continue
                 
                 # 从文件名提取会话ID
-                parts = filename.replace('.json', '').split('-')
-                session_id = parts[-1] if len(parts) > 2 else filename.replace('.json', '')
+                stem = os.path.splitext(entry.name)[0]
+                parts = stem.split('-')
+                session_id = parts[-1] if len(parts) > 2 else stem
                 
-                files.append((filepath, session_id, mtime))
+                files.append((entry.path, session_id, entry.stat().st_mtime))
         
         # 按修改时间排序，最新的在前
         files.sort(key=lambda x: x[2], reverse=True)
@@ -352,9 +587,7 @@ def start_new_session(config_id: str, history_dir: str = "chat-history") -> str:
     Returns:
         新的会话ID
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
-    return f"sess_{timestamp}_{unique_id}"
+    return _make_session_id()
 
 
 def create_history_manager(config_id: str, history_dir: str = "chat-history") -> ChatHistory:
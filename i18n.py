@@ -7,8 +7,30 @@ i18n国际化模块 (i18n.py)
 
 import json
 import os
+import codecs
 from typing import Dict, Any, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _flatten(data: Dict[str, Any], prefix: str = ''):
+    """将嵌套的翻译数据展开为 (点号分隔键, 文本) 序列"""
+    for k, v in data.items():
+        full_key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            yield from _flatten(v, full_key)
+        else:
+            yield full_key, v
+
+
+# 支持的语言代码（有序元组用于展示，集合用于成员判断）
+LANGUAGE_CODES = ('zh-CN', 'en-US')
+AVAILABLE_LANGUAGES = frozenset(LANGUAGE_CODES)
+
 
 class I18n:
     """国际化管理类"""
@@ -21,21 +43,14 @@ class I18n:
             default_language: 默认语言代码
         """
         self.current_language = default_language
-        self.translations: Dict[str, Dict[str, Any]] = {}
-        self.available_languages = ['zh-CN', 'en-US']
+        self.translations: Dict[str, Dict[str, Any]] = {}  # 语言代码 -> 展开后的 {键: 文本}
+        self.available_languages = list(LANGUAGE_CODES)
         self.i18n_dir = os.path.join(os.path.dirname(__file__), 'i18n')
+        self._resolve_cache: Dict[tuple, Optional[str]] = {}  # (语言, 键) -> 翻译文本
         
-        # 加载所有可用语言
-        self._load_all_languages()
-        
-        # 设置当前语言
+        # 设置当前语言（语言文件按需加载）
         self.set_language(default_language)
     
-    def _load_all_languages(self):
-        """加载所有可用的语言文件"""
-        for lang_code in self.available_languages:
-            self._load_language(lang_code)
-    
     def _load_language(self, language_code: str) -> bool:
         """
         加载指定语言文件
@@ -53,8 +68,14 @@ class I18n:
                 print(f"Warning: Language file {lang_file} not found")
                 return False
             
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                self.translations[language_code] = json.load(f)
+            # 一次性读取字节再解析，兼容带BOM的文件
+            with open(lang_file, 'rb') as f:
+                raw = f.read().removeprefix(codecs.BOM_UTF8)
+            
+            data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+            
+            # 加载时展开嵌套结构，查询时只需一次字典查找
+            self.translations[language_code] = dict(_flatten(data))
             
             return True
             
@@ -72,13 +93,14 @@ class I18n:
         Returns:
             是否设置成功
         """
-        if language_code not in self.available_languages:
+        if language_code not in AVAILABLE_LANGUAGES:
             return False
         
         if language_code not in self.translations:
             if not self._load_language(language_code):
                 return False
         
+        # 解析缓存按(语言, 键)存放，切换语言后自然使用新语言的条目，无需清空
         self.current_language = language_code
         return True
     
@@ -98,6 +120,38 @@ class I18n:
         }
         return language_names.get(language_code, language_code)
     
+    def _resolve(self, key: str) -> Optional[str]:
+        """
+        解析翻译键对应的原始文本（不做格式化）
+        
+        Args:
+            key: 翻译键
+            
+        Returns:
+            翻译文本，未找到时返回None
+        """
+        # 依次尝试当前语言和默认语言（中文）
+        languages = [self.translations.get(self.current_language, {})]
+        if self.current_language != 'zh-CN':
+            if 'zh-CN' not in self.translations:
+                self._load_language('zh-CN')
+            languages.append(self.translations.get('zh-CN', {}))
+        
+        for translations in languages:
+            value = translations.get(key)
+            if value is None:
+                continue
+            
+            if isinstance(value, str):
+                return value
+            
+            print(f"Warning: Translation key '{key}' is not a string")
+            return None
+        
+        # 如果都没找到
+        print(f"Warning: Translation not found for key '{key}'")
+        return None
+    
     def t(self, key: str, *args, **kwargs) -> str:
         """
         获取翻译文本
@@ -110,62 +164,31 @@ class I18n:
         Returns:
             翻译后的文本
         """
-        # 获取当前语言的翻译数据
-        current_translations = self.translations.get(self.current_language, {})
-        
-        # 解析嵌套键
-        keys = key.split('.')
-        value = current_translations
-        
+        # 先查解析缓存，未命中时再遍历翻译数据
+        cache_key = (self.current_language, key)
         try:
-            for k in keys:
-                value = value[k]
-            
-            # 如果找到了翻译文本
-            if isinstance(value, str):
-                # 处理格式化参数
-                if args or kwargs:
-                    try:
-                        # 支持位置参数格式化 {0}, {1}, ...
-                        if args:
-                            value = value.format(*args)
-                        # 支持关键字参数格式化 {name}, {value}, ...
-                        elif kwargs:
-                            value = value.format(**kwargs)
-                    except (KeyError, IndexError, ValueError) as e:
-                        print(f"Warning: Format error for key '{key}': {e}")
-                
-                return value
-            else:
-                print(f"Warning: Translation key '{key}' is not a string")
-                return key
-                
-        except (KeyError, TypeError):
-            # 如果当前语言没有找到，尝试使用默认语言（中文）
-            if self.current_language != 'zh-CN':
-                default_translations = self.translations.get('zh-CN', {})
-                value = default_translations
-                
-                try:
-                    for k in keys:
-                        value = value[k]
-                    
-                    if isinstance(value, str):
-                        if args or kwargs:
-                            try:
-                                if args:
-                                    value = value.format(*args)
-                                elif kwargs:
-                                    value = value.format(**kwargs)
-                            except (KeyError, IndexError, ValueError):
-                                pass
-                        return value
-                except (KeyError, TypeError):
-                    pass
-            
-            # 如果都没找到，返回原始键
-            print(f"Warning: Translation not found for key '{key}'")
+            value = self._resolve_cache[cache_key]
+        except KeyError:
+            value = self._resolve(key)
+            self._resolve_cache[cache_key] = value
+        
+        # 如果都没找到，返回原始键
+        if value is None:
             return key
+        
+        # 处理格式化参数
+        if args or kwargs:
+            try:
+                # 支持位置参数格式化 {0}, {1}, ...
+                if args:
+                    value = value.format(*args)
+                # 支持关键字参数格式化 {name}, {value}, ...
+                elif kwargs:
+                    value = value.format(**kwargs)
+            except (KeyError, IndexError, ValueError) as e:
+                print(f"Warning: Format error for key '{key}': {e}")
+        
+        return value
     
     def has_translation(self, key: str, language_code: Optional[str] = None) -> bool:
         """
@@ -181,16 +204,11 @@ class I18n:
         if language_code is None:
             language_code = self.current_language
         
-        translations = self.translations.get(language_code, {})
-        keys = key.split('.')
-        value = translations
+        if language_code not in self.translations and language_code in AVAILABLE_LANGUAGES:
+            self._load_language(language_code)
         
-        try:
-            for k in keys:
-                value = value[k]
-            return isinstance(value, str)
-        except (KeyError, TypeError):
-            return False
+        translations = self.translations.get(language_code, {})
+        return isinstance(translations.get(key), str)
     
     def get_weekday_name(self, weekday_index: int) -> str:
         """
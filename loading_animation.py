@@ -2,50 +2,197 @@
 # -*- coding: utf-8 -*-
 """
 加载动画模块
-提供六点字符转圈的加载动画，支持独立线程运行
+提供六点字符转圈的加载动画，所有动画共享一个后台刷新线程
 """
 
+import os
 import sys
 import time
+import asyncio
+import atexit
 import threading
+import unicodedata
+import weakref
 from typing import Optional
 
+
+class _Ticker:
+    """所有加载动画共享的刷新线程，按各自的帧间隔依次绘制"""
+    
+    def __init__(self):
+        self._animations = weakref.WeakSet()  # 正在播放的动画
+        self._cond = threading.Condition()  # 保护动画集合，并用于唤醒刷新线程
+        self._pending = False  # 是否有尚未处理的注册、注销或消息更新
+        self._thread: Optional[threading.Thread] = None
+    
+    def register(self, animation: 'LoadingAnimation'):
+        """注册动画，必要时启动刷新线程"""
+        with self._cond:
+            self._animations.add(animation)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._notify()
+    
+    def unregister(self, animation: 'LoadingAnimation'):
+        """注销动画"""
+        with self._cond:
+            self._animations.discard(animation)
+            self._notify()
+    
+    def wake(self):
+        """唤醒刷新线程立即处理到期的帧"""
+        with self._cond:
+            self._notify()
+    
+    def _notify(self):
+        """记录待处理事件并唤醒刷新线程（调用方需持有条件变量）"""
+        self._pending = True
+        self._cond.notify()
+    
+    def _run(self):
+        """刷新线程主循环"""
+        monotonic = time.monotonic
+        cond = self._cond
+        has_pending = lambda: self._pending
+        
+        while True:
+            with cond:
+                # 没有动画时阻塞等待，不产生周期性唤醒
+                while not self._animations:
+                    self._pending = False
+                    cond.wait()
+                animations = list(self._animations)
+                self._pending = False
+            
+            # 绘制所有到期的动画，并计算最近的下一帧时间
+            now = monotonic()
+            next_deadline = None
+            for animation in animations:
+                if animation._deadline <= now:
+                    animation._tick()
+                    animation._deadline += animation.interval
+                    if animation._deadline <= now:
+                        # 渲染慢于帧间隔时不追赶落后的帧
+                        animation._deadline = now + animation.interval
+                if next_deadline is None or animation._deadline < next_deadline:
+                    next_deadline = animation._deadline
+            
+            # 等到下一帧到期，期间有新事件则提前醒来
+            remaining = next_deadline - monotonic()
+            if remaining > 0:
+                with cond:
+                    cond.wait_for(has_pending, remaining)
+
+
+_ticker = _Ticker()
+
+
 class LoadingAnimation:
     """加载动画类，使用六点字符实现转圈动画"""
     
     # 六点字符动画帧
-    FRAMES = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
+    FRAMES = ('⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏')
     
-    def __init__(self, interval: float = 0.1):
+    # 回到行首并清除整行
+    CLEAR_LINE = "\r\x1b[2K"
+    CLEAR_LINE_BYTES = CLEAR_LINE.encode('utf-8')
+    
+    def __init__(self, interval: float = 0.1, stream=None):
         """
         初始化加载动画
         
         Args:
             interval: 动画帧间隔时间（秒）
+            stream: 输出流，默认为sys.stderr，避免动画混入标准输出
         """
         self.interval = interval
-        self._thread: Optional[threading.Thread] = None
-        self._stop_event = threading.Event()
+        self._stream = stream or sys.stderr
+        self._is_tty: Optional[bool] = None  # 输出流是否为终端，首次检测后缓存
+        self._active = False  # 动画是否正在播放
+        self._frame_index = 0
+        self._deadline = 0.0  # 下一帧的绘制时间（time.monotonic）
+        self._draw_lock = threading.Lock()  # 保证停止后不会再绘制帧
         self._message = ""
+        self._rendered: tuple = ()  # 预先格式化好的每一帧输出（不可变快照，整体替换）
+        self._raw_output = False  # 是否直接写入输出流的文件描述符
+        self._dumb_terminal = False  # 终端是否不支持ANSI控制序列
+        self._write = self._write_text
         self._lock = threading.Lock()
     
-    def _animate(self):
-        """动画循环函数"""
-        frame_index = 0
+    def _stream_is_tty(self) -> bool:
+        """检查输出流是否连接到终端（结果缓存，输出流在运行期间不会改变）"""
+        if self._is_tty is None:
+            try:
+                self._is_tty = self._stream is not None and self._stream.isatty()
+            except (AttributeError, ValueError):
+                self._is_tty = False
+        return self._is_tty
+    
+    def _write_text(self, data: str):
+        """通过输出流的文本层写出并刷新"""
+        self._stream.write(data)
+        self._stream.flush()
+    
+    @staticmethod
+    def _display_width(text: str) -> int:
+        """计算文本在终端中占用的列数（全角字符占两列）"""
+        return sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in text)
+    
+    def _clear_sequence(self):
+        """获取清除当前行的输出，已按当前输出方式编码"""
+        if not self._dumb_terminal:
+            return self.CLEAR_LINE_BYTES if self._raw_output else self.CLEAR_LINE
+        
+        # 不支持ANSI的终端只能用空格覆盖（帧字符 + 空格 + 消息）
+        clear = "\r" + " " * (self._display_width(self._message) + 2) + "\r"
+        return clear.encode('utf-8') if self._raw_output else clear
+    
+    def _select_writer(self):
+        """
+        选择帧输出方式：优先把整帧字节一次性写入文件描述符（单次系统调用），
+        无法获取文件描述符或在Windows控制台上时回退到输出流的文本层
+        """
+        self._dumb_terminal = os.environ.get("TERM") == "dumb"
+        
+        # 先刷新标准输出，保证动画出现在之前的输出之后
+        if sys.stdout is not None:
+            sys.stdout.flush()
         
-        while not self._stop_event.is_set():
-            with self._lock:
-                # 清除当前行并显示动画
-                frame = self.FRAMES[frame_index]
-                output = f"\r{frame} {self._message}"
-                sys.stdout.write(output)
-                sys.stdout.flush()
+        if os.name != 'nt':
+            try:
+                fd = self._stream.fileno()
+                # 刷新文本层缓冲，保证与之前的输出顺序一致
+                self._stream.flush()
+                self._raw_output = True
+                self._write = lambda data: os.write(fd, data)
+                return
+            except (AttributeError, OSError, ValueError):
+                pass
+        
+        self._raw_output = False
+        self._write = self._write_text
+    
+    def _render_frames(self, message: str) -> tuple:
+        """根据消息预先生成每一帧的输出（回到行首并清除整行后绘制）"""
+        prefix = "\r" if self._dumb_terminal else self.CLEAR_LINE
+        frames = tuple(f"{prefix}{frame} {message}" for frame in self.FRAMES)
+        if self._raw_output:
+            return tuple(frame.encode('utf-8') for frame in frames)
+        return frames
+    
+    def _tick(self):
+        """绘制一帧（由共享刷新线程调用）"""
+        with self._draw_lock:
+            if not self._active:
+                return
             
-            # 更新帧索引
-            frame_index = (frame_index + 1) % len(self.FRAMES)
+            # 帧快照通过属性整体替换更新，读取无需加锁
+            self._write(self._rendered[self._frame_index])
             
-            # 等待指定间隔
-            self._stop_event.wait(self.interval)
+            self._frame_index += 1
+            if self._frame_index == len(self.FRAMES):
+                self._frame_index = 0
     
     def start(self, message: str = "加载中..."):
         """
@@ -54,15 +201,23 @@ class LoadingAnimation:
         Args:
             message: 加载消息文本
         """
-        if self._thread and self._thread.is_alive():
+        if self._active:
             return  # 已经在运行
         
-        with self._lock:
-            self._message = message
-            self._stop_event.clear()
+        # 输出未连接终端（管道、重定向、CI）时不播放动画，只输出一次消息
+        if not self._stream_is_tty():
+            print(message, file=self._stream)
+            return
+        
+        # 动画尚未注册到刷新线程，这里的赋值无需加锁（调用方不应与update_message并发调用start）
+        self._select_writer()
+        self._message = message
+        self._rendered = self._render_frames(message)
         
-        self._thread = threading.Thread(target=self._animate, daemon=True)
-        self._thread.start()
+        self._frame_index = 0
+        self._deadline = time.monotonic()
+        self._active = True
+        _ticker.register(self)
     
     def stop(self, clear_line: bool = True):
         """
@@ -71,15 +226,19 @@ class LoadingAnimation:
         Args:
             clear_line: 是否清除当前行
         """
-        if self._thread and self._thread.is_alive():
-            self._stop_event.set()
-            self._thread.join(timeout=1.0)  # 等待最多1秒
+        if not self._active:
+            return
         
-        if clear_line:
-            with self._lock:
-                # 清除当前行
-                sys.stdout.write("\r" + " " * (len(self._message) + 10) + "\r")
-                sys.stdout.flush()
+        # 在绘制锁内停止并清除当前行，刷新线程之后不会再绘制本动画
+        with self._draw_lock:
+            self._active = False
+            if clear_line:
+                self._write(self._clear_sequence())
+        _ticker.unregister(self)
+    
+    def close(self):
+        """停止加载动画"""
+        self.stop()
     
     def update_message(self, message: str):
         """
@@ -88,8 +247,18 @@ class LoadingAnimation:
         Args:
             message: 新的加载消息
         """
+        # 消息未变化时无需重新生成帧，也不必加锁
+        if message == self._message:
+            return
+        
         with self._lock:
             self._message = message
+            self._rendered = self._render_frames(message)
+        
+        # 唤醒刷新线程，新消息立即显示而不必等到下一帧
+        if self._active:
+            self._deadline = time.monotonic()
+            _ticker.wake()
     
     def is_running(self) -> bool:
         """
@@ -98,7 +267,7 @@ class LoadingAnimation:
         Returns:
             bool: 动画是否正在运行
         """
-        return self._thread is not None and self._thread.is_alive()
+        return self._active
     
     def __enter__(self):
         """上下文管理器入口"""
@@ -108,10 +277,113 @@ class LoadingAnimation:
         """上下文管理器出口"""
         self.stop()
 
+class AsyncLoadingAnimation(LoadingAnimation):
+    """基于asyncio任务的加载动画，供异步程序使用，不额外创建线程"""
+    
+    def __init__(self, interval: float = 0.1, stream=None):
+        """
+        初始化异步加载动画
+        
+        Args:
+            interval: 动画帧间隔时间（秒）
+            stream: 输出流，默认为sys.stderr
+        """
+        super().__init__(interval, stream)
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _animate_async(self):
+        """动画协程，被取消时结束"""
+        frame_index = 0
+        frame_count = len(self.FRAMES)
+        
+        while True:
+            self._write(self._rendered[frame_index])
+            
+            frame_index += 1
+            if frame_index == frame_count:
+                frame_index = 0
+            
+            await asyncio.sleep(self.interval)
+    
+    def start(self, message: str = "加载中..."):
+        """
+        在当前事件循环中启动加载动画（需在协程中调用）
+        
+        Args:
+            message: 加载消息文本
+        """
+        if self.is_running():
+            return  # 已经在运行
+        
+        # 输出未连接终端（管道、重定向、CI）时不播放动画，只输出一次消息
+        if not self._stream_is_tty():
+            print(message, file=self._stream)
+            return
+        
+        # 动画任务尚未创建，且协程都在同一事件循环线程中执行，这里的赋值无需加锁
+        self._select_writer()
+        self._message = message
+        self._rendered = self._render_frames(message)
+        
+        self._task = asyncio.get_running_loop().create_task(self._animate_async())
+    
+    def stop(self, clear_line: bool = True):
+        """
+        停止加载动画
+        
+        Args:
+            clear_line: 是否清除当前行
+        """
+        if not self.is_running():
+            return
+        
+        # 与动画协程运行在同一线程，取消后可直接清除当前行
+        self._task.cancel()
+        self._task = None
+        if clear_line:
+            self._write(self._clear_sequence())
+    
+    def close(self):
+        """停止加载动画"""
+        self.stop()
+    
+    def is_running(self) -> bool:
+        """
+        检查动画是否正在运行
+        
+        Returns:
+            bool: 动画是否正在运行
+        """
+        return self._task is not None and not self._task.done()
+    
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器出口"""
+        self.stop()
+
 # 全局加载动画实例
 _global_loader: Optional[LoadingAnimation] = None
 _loader_lock = threading.Lock()
 
+def _ensure_loader() -> LoadingAnimation:
+    """
+    获取全局加载动画实例，首次调用时创建（双重检查，仅初始化时加锁）
+    
+    Returns:
+        LoadingAnimation: 加载动画实例
+    """
+    global _global_loader
+    
+    if _global_loader is None:
+        with _loader_lock:
+            if _global_loader is None:
+                _global_loader = LoadingAnimation()
+                atexit.register(_global_loader.close)
+    return _global_loader
+
 def start_loading(message: str = "加载中...") -> LoadingAnimation:
     """
     启动全局加载动画
@@ -122,14 +394,9 @@ def start_loading(message: str = "加载中...") -> LoadingAnimation:
     Returns:
         LoadingAnimation: 加载动画实例
     """
-    global _global_loader
-    
-    with _loader_lock:
-        if _global_loader is None:
-            _global_loader = LoadingAnimation()
-        
-        _global_loader.start(message)
-        return _global_loader
+    loader = _ensure_loader()
+    loader.start(message)
+    return loader
 
 def stop_loading(clear_line: bool = True):
     """
@@ -138,11 +405,9 @@ def stop_loading(clear_line: bool = True):
     Args:
         clear_line: 是否清除当前行
     """
-    global _global_loader
-    
-    with _loader_lock:
-        if _global_loader is not None:
-            _global_loader.stop(clear_line)
+    loader = _global_loader
+    if loader is not None:
+        loader.stop(clear_line)
 
 def update_loading_message(message: str):
     """
@@ -151,11 +416,9 @@ def update_loading_message(message: str):
     Args:
         message: 新的加载消息
     """
-    global _global_loader
-    
-    with _loader_lock:
-        if _global_loader is not None:
-            _global_loader.update_message(message)
+    loader = _global_loader
+    if loader is not None:
+        loader.update_message(message)
 
 def is_loading() -> bool:
     """
@@ -164,10 +427,8 @@ def is_loading() -> bool:
     Returns:
         bool: 是否正在加载
     """
-    global _global_loader
-    
-    with _loader_lock:
-        return _global_loader is not None and _global_loader.is_running()
+    loader = _global_loader
+    return loader is not None and loader.is_running()
 
 # 便捷的上下文管理器
 class loading_context:
@@ -20,23 +20,83 @@ start_loading(t('processing.app_launch'))
 VERSION = "1.2.0"
 
 import os
+import re
 import sys
 import time
-import yaml
 import argparse
-from typing import Dict, Any, Optional, List
+import copy
+import json
+import hashlib
+import importlib
+import threading
+from collections import ChainMap, OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 # 导入自定义模块 - 延迟导入重型模块以提升启动速度
 from template import process_template
-from markdown_renderer import render_ai_response, render_streaming_response, render_system_message
 
-try:
-    from prompt_toolkit import prompt
-    from prompt_toolkit.key_binding import KeyBindings
-    from prompt_toolkit.keys import Keys
-    PROMPT_TOOLKIT_AVAILABLE = True
-except ImportError:
-    PROMPT_TOOLKIT_AVAILABLE = False
+# 设置 OCTOOL_EAGER_IMPORT=1 时在启动阶段立即解析所有延迟导入（用于CI检查）
+EAGER_IMPORT = os.environ.get('OCTOOL_EAGER_IMPORT') == '1'
 
+class _LazyModule:
+    """延迟导入代理，首次访问属性时才真正导入模块"""
+    
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+    
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+        return self._module
+    
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+def lazy_import(module_name: str) -> _LazyModule:
+    """创建延迟导入的模块代理
+    
+    Args:
+        module_name: 模块名
+        
+    Returns:
+        模块代理对象
+    """
+    proxy = _LazyModule(module_name)
+    if EAGER_IMPORT:
+        proxy._load()
+    return proxy
+
+yaml = lazy_import('yaml')
+openai = lazy_import('openai')
+markdown_renderer = lazy_import('markdown_renderer')
+
+# prompt_toolkit 在首次多行输入时才检测是否可用
+PROMPT_TOOLKIT_AVAILABLE = False
+_PT_CHECKED = False
+
+def _check_prompt_toolkit() -> bool:
+    """检测 prompt_toolkit 是否可用（只检测一次）"""
+    global PROMPT_TOOLKIT_AVAILABLE, _PT_CHECKED
+    if not _PT_CHECKED:
+        _PT_CHECKED = True
+        try:
+            import prompt_toolkit  # noqa: F401
+            PROMPT_TOOLKIT_AVAILABLE = True
+        except ImportError:
+            PROMPT_TOOLKIT_AVAILABLE = False
+    return PROMPT_TOOLKIT_AVAILABLE
+
+if EAGER_IMPORT:
+    _check_prompt_toolkit()
+
+# 匹配输入开头的命令词（到第一个空白字符为止）
+_COMMAND_RE = re.compile(r"/\S*")
+
+# 匹配时间相关的模板变量
+_TIME_TOKEN_RE = re.compile(r"\{\{\s*(?:time|date|datetime|timestamp|weekday|year|month|day)\s*\}\}", re.IGNORECASE)
+
+@lru_cache(maxsize=32)
 def ensure_datetime_in_prompt(prompt: str) -> str:
     """确保系统提示词包含时间信息
     
@@ -50,8 +110,7 @@ def ensure_datetime_in_prompt(prompt: str) -> str:
         prompt = "你是一个有用的AI助手。"
     
     # 检查是否已经包含时间相关的模板变量
-    time_keywords = ['{{time}}', '{{date}}', '{{datetime}}', '{{timestamp}}', '{{weekday}}', '{{year}}', '{{month}}', '{{day}}']
-    has_time_info = any(keyword in prompt for keyword in time_keywords)
+    has_time_info = _TIME_TOKEN_RE.search(prompt) is not None
     
     # 如果没有时间信息，自动添加
     if not has_time_info:
@@ -59,16 +118,64 @@ def ensure_datetime_in_prompt(prompt: str) -> str:
     
     return prompt
 
-def get_multiline_input(prompt_text: str) -> str:
-    """获取多行输入，支持Alt+Enter换行，Ctrl+J换行（备用方案）
+# 精确到秒的模板变量，包含这些变量的提示词每次都需重新替换
+_SUB_DAY_TOKEN_RE = re.compile(r"\{\{\s*(?:time|datetime|timestamp)\s*\}\}", re.IGNORECASE)
+
+# 只含日期级模板变量的提示词按天缓存：提示词 -> (日期, 处理结果)
+_DAILY_PROMPT_CACHE: Dict[str, Tuple[str, str]] = {}
+
+@lru_cache(maxsize=32)
+def _has_sub_day_tokens(prompt: str) -> bool:
+    return _SUB_DAY_TOKEN_RE.search(prompt) is not None
+
+def build_system_prompt(system_prompt: str) -> str:
+    """生成最终的系统提示词（补充时间信息并替换模板变量）
+    
+    Args:
+        system_prompt: 配置中的原始系统提示词
+        
+    Returns:
+        处理后的系统提示词
+    """
+    # 补充时间信息的结果只取决于原始提示词，可以缓存；模板变量需每次替换以获得当前时间
+    prompt = ensure_datetime_in_prompt(system_prompt)
+    if _has_sub_day_tokens(prompt):
+        return process_template(prompt)
+    
+    # 只含日期、星期等变量时，同一天内的替换结果不变
+    today = time.strftime('%Y-%m-%d')
+    cached = _DAILY_PROMPT_CACHE.get(prompt)
+    if cached and cached[0] == today:
+        return cached[1]
+    result = process_template(prompt)
+    _DAILY_PROMPT_CACHE[prompt] = (today, result)
+    return result
+
+def read_line(prompt_text: str) -> str:
+    """输出提示并读取一行输入，直接使用stdout/stdin而不经过input()
     
     Args:
         prompt_text: 提示文本
         
     Returns:
-        str: 用户输入的文本
+        str: 去掉换行符的输入内容
     """
-    if PROMPT_TOOLKIT_AVAILABLE:
+    sys.stdout.write(prompt_text)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\r\n')
+
+_MULTILINE_KB = None
+_MULTILINE_SESSION = None
+
+def _get_multiline_kb():
+    """获取多行输入的键绑定（首次使用时创建）"""
+    global _MULTILINE_KB
+    if _MULTILINE_KB is None:
+        from prompt_toolkit.key_binding import KeyBindings
+        
         # 创建自定义键绑定
         kb = KeyBindings()
         
@@ -87,35 +194,314 @@ def get_multiline_input(prompt_text: str) -> str:
             """Ctrl+J换行 (备用方案)"""
             event.app.current_buffer.insert_text('\n')
         
+        _MULTILINE_KB = kb
+    return _MULTILINE_KB
+
+# 可按Tab补全的命令词，由 ChatTool 初始化时注册
+_COMMAND_WORDS: Tuple[str, ...] = ()
+_READLINE_READY = False
+
+def register_command_words(words) -> None:
+    """注册可补全的命令词
+    
+    Args:
+        words: 命令词序列（如 '/help'）
+    """
+    global _COMMAND_WORDS
+    _COMMAND_WORDS = tuple(sorted(words))
+
+def _complete_command(text: str, state: int) -> Optional[str]:
+    """readline补全函数：返回第state个以text开头的命令词"""
+    matches = [word for word in _COMMAND_WORDS if word.startswith(text)]
+    return matches[state] if state < len(matches) else None
+
+def _enable_readline() -> None:
+    """为标准输入启用readline行编辑、会话内历史和命令补全（只执行一次）"""
+    global _READLINE_READY
+    if _READLINE_READY:
+        return
+    _READLINE_READY = True
+    try:
+        import readline
+    except ImportError:
+        # Windows等环境可能没有readline，保持原有的input()行为
+        return
+    readline.set_completer_delims(' \t\n')
+    readline.set_completer(_complete_command)
+    readline.parse_and_bind('tab: complete')
+
+def _get_multiline_session():
+    """获取复用的多行输入会话（首次使用时创建）"""
+    global _MULTILINE_SESSION
+    if _MULTILINE_SESSION is None:
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.completion import WordCompleter
+        _MULTILINE_SESSION = PromptSession(
+            key_bindings=_get_multiline_kb(),
+            multiline=True,  # 启用多行支持
+            wrap_lines=True,
+            # 整段输入是命令前缀时才补全，按Tab触发；会话内历史可用上下键翻阅
+            completer=WordCompleter(list(_COMMAND_WORDS), sentence=True),
+            complete_while_typing=False
+        )
+    return _MULTILINE_SESSION
+
+def get_multiline_input(prompt_text: str) -> str:
+    """获取多行输入，支持Alt+Enter换行，Ctrl+J换行（备用方案）
+    
+    Args:
+        prompt_text: 提示文本
+        
+    Returns:
+        str: 用户输入的文本
+    """
+    if _check_prompt_toolkit():
         try:
-            # 使用prompt-toolkit获取输入，移除ANSI颜色代码
-            clean_prompt = prompt_text.replace('\033[33m', '').replace('\033[0m', '')
+            # 使用prompt-toolkit获取输入
+            session = _get_multiline_session()
             print(prompt_text, end='')  # 先打印带颜色的提示
-            result = prompt(
-                '',  # 空提示，因为我们已经打印了
-                key_bindings=kb,
-                multiline=True,  # 启用多行支持
-                wrap_lines=True
-            )
-            return result
+            return session.prompt('')  # 空提示，因为我们已经打印了
         except (KeyboardInterrupt, EOFError):
             raise
         except Exception:
             # 如果prompt-toolkit出错，回退到标准输入
+            _enable_readline()
             print(prompt_text, end='')
             return input()
     else:
         # 如果没有prompt-toolkit，使用标准输入
+        _enable_readline()
         print(f"{prompt_text}(提示: 此环境不支持Shift+Enter换行功能)", end='')
         return input()
 
-# 颜色定义
-COLOR_YELLOW = "\033[33m"
-COLOR_GREEN = "\033[32m"
-COLOR_BLUE = "\033[34m"
-COLOR_RED = "\033[31m"
-COLOR_CYAN = "\033[36m"
-COLOR_RESET = "\033[0m"
+# 流式纯文本输出的缓冲阈值：累计字符数或距上次输出的时间（秒）
+STREAM_FLUSH_CHARS = 256
+STREAM_FLUSH_INTERVAL = 0.05
+
+def stream_plain_text(response) -> str:
+    """以纯文本形式输出流式响应，按行/长度/时间合并写入
+    
+    Args:
+        response: 流式响应迭代器
+        
+    Returns:
+        str: 完整的回复内容
+    """
+    stdout = sys.stdout
+    buffer = getattr(stdout, 'buffer', None)
+    if buffer is not None:
+        # 直接写入底层字节缓冲区，跳过文本层的逐次编码与加锁
+        stdout.flush()
+        encoding = stdout.encoding or 'utf-8'
+        raw_write = buffer.write
+        write = lambda text: raw_write(text.encode(encoding, 'replace'))
+        flush = buffer.flush
+    else:
+        write = stdout.write
+        flush = stdout.flush
+    monotonic = time.monotonic
+    parts = []
+    pending = []
+    add_part = parts.append
+    add_pending = pending.append
+    pending_len = 0
+    last_flush = monotonic()
+    
+    for chunk in response:
+        choices = chunk.choices
+        if not choices:
+            continue
+        content = choices[0].delta.content
+        if not content:
+            continue
+        add_part(content)
+        add_pending(content)
+        pending_len += len(content)
+        
+        now = monotonic()
+        if '\n' in content or pending_len >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+            write(''.join(pending))
+            flush()
+            pending.clear()
+            pending_len = 0
+            last_flush = now
+    
+    pending.append('\n')  # 换行
+    write(''.join(pending))
+    flush()
+    return ''.join(parts)
+
+def _use_color() -> bool:
+    """是否输出颜色代码：遵循 NO_COLOR 约定，输出重定向到文件或管道时也不输出"""
+    if os.environ.get('NO_COLOR') is not None:
+        return False
+    isatty = getattr(sys.stdout, 'isatty', None)
+    try:
+        return bool(isatty and isatty())
+    except (ValueError, OSError):
+        return False
+
+# 颜色定义（不输出颜色时为空字符串，各处拼接无需额外判断）
+_COLOR_ENABLED = _use_color()
+COLOR_YELLOW = "\033[33m" if _COLOR_ENABLED else ""
+COLOR_GREEN = "\033[32m" if _COLOR_ENABLED else ""
+COLOR_BLUE = "\033[34m" if _COLOR_ENABLED else ""
+COLOR_RED = "\033[31m" if _COLOR_ENABLED else ""
+COLOR_CYAN = "\033[36m" if _COLOR_ENABLED else ""
+COLOR_RESET = "\033[0m" if _COLOR_ENABLED else ""
+
+@lru_cache(maxsize=512)
+def _ct_cached(color: str, key: str, lang: str) -> str:
+    return f"{color}{t(key)}{COLOR_RESET}"
+
+def _ct(color: str, key: str) -> str:
+    """获取带颜色的无参数翻译文本（按语言缓存）
+    
+    Args:
+        color: 颜色代码
+        key: 翻译键
+        
+    Returns:
+        带颜色的文本
+    """
+    return _ct_cached(color, key, get_language())
+
+@lru_cache(maxsize=128)
+def _label_cached(key: str, lang: str) -> str:
+    return f"{COLOR_BLUE}{t(key)}: "
+
+def _label(key: str, value: Any) -> str:
+    """生成蓝色的“标签: 值”状态行，标签部分按语言缓存
+    
+    Args:
+        key: 标签的翻译键
+        value: 显示的值
+        
+    Returns:
+        带颜色的状态行
+    """
+    return f"{_label_cached(key, get_language())}{value}{COLOR_RESET}"
+
+def write_lines(lines: List[str]) -> None:
+    """一次性输出多行文本，减少write调用次数
+    
+    Args:
+        lines: 文本行列表（不含换行符）
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+_YAML_IO = None
+
+def _yaml_io() -> Tuple[Any, Any]:
+    """获取YAML加载器和输出器，优先使用libyaml的C实现"""
+    global _YAML_IO
+    if _YAML_IO is None:
+        try:
+            _YAML_IO = (yaml.CSafeLoader, yaml.CSafeDumper)
+        except AttributeError:
+            # PyYAML未编译libyaml支持时回退到纯Python实现
+            _YAML_IO = (yaml.SafeLoader, yaml.SafeDumper)
+    return _YAML_IO
+
+# YAML解析结果缓存：路径 -> (mtime, size, 数据, 内容哈希)，避免重复解析未变化的配置文件
+_YAML_CACHE: "OrderedDict[str, Tuple[float, int, Dict[str, Any], str]]" = OrderedDict()
+_YAML_CACHE_MAX = 16
+
+def _yaml_cache_put(path: str, st: os.stat_result, data: Dict[str, Any], digest: str) -> None:
+    """写入YAML缓存，超出容量时淘汰最久未使用的条目"""
+    _YAML_CACHE[path] = (st.st_mtime, st.st_size, data, digest)
+    _YAML_CACHE.move_to_end(path)
+    if len(_YAML_CACHE) > _YAML_CACHE_MAX:
+        _YAML_CACHE.popitem(last=False)
+
+def _read_fd(fd: int, size: int) -> bytes:
+    """从文件描述符一次性读取全部内容
+    
+    Args:
+        fd: 文件描述符
+        size: 预期大小（fstat得到）
+        
+    Returns:
+        文件内容
+    """
+    # 多读一个字节：返回不足时说明已到文件末尾，无需再次调用read
+    data = os.read(fd, size + 1)
+    if len(data) <= size:
+        return data
+    
+    # 文件在stat之后增长，继续读到末尾
+    chunks = [data]
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+# Token值格式：整数，或带K/k单位的数字（如 64K、1.5k）
+_TOKEN_K_RE = re.compile(r"(\d+(?:\.\d+)?)[Kk]|(\d+)")
+
+def parse_token_value(token_input: str, default_value: int) -> int:
+    """解析Token值，支持K/k单位
+    
+    Args:
+        token_input: Token值字符串
+        default_value: 解析失败时的默认值
+        
+    Returns:
+        Token数
+    """
+    if not token_input:
+        return default_value
+    
+    match = _TOKEN_K_RE.fullmatch(token_input.strip())
+    if not match:
+        return default_value
+    if match.group(1) is not None:
+        # K单位：乘以1000
+        return int(float(match.group(1)) * 1000)
+    return int(match.group(2))
+
+# JSON缓存的数据格式版本，数据规范化规则变化时递增
+_SIDECAR_SCHEMA = 1
+
+def _normalize_config_data(data: Any) -> Dict[str, Any]:
+    """规范化刚从YAML解析出的配置数据，只在解析时执行一次
+    
+    去掉非字典的顶层条目（default_config除外），并把字符串形式的
+    max_tokens（如"64K"）转换为整数。
+    
+    Args:
+        data: YAML解析结果
+        
+    Returns:
+        规范化后的配置数据
+    """
+    if not isinstance(data, dict):
+        return {}
+    
+    result = {}
+    for key, value in data.items():
+        if key == 'default_config':
+            result[key] = value
+        elif isinstance(value, dict):
+            max_tokens = value.get('max_tokens')
+            if isinstance(max_tokens, str):
+                value['max_tokens'] = parse_token_value(max_tokens, 64000)
+            result[key] = value
+    return result
+
+# 多语言字段的默认值：(字段, 是否英文) -> 文本
+_MULTILANG_DEFAULTS = {
+    ('name', False): '默认',
+    ('name', True): 'Default',
+    ('welcome_message', False): '我可以帮你写代码、读文件、写作各种创意内容，请把你的任务交给我吧~',
+    ('welcome_message', True): 'I can help you write code, read files, and write all kinds of creative content, please leave your task to me~',
+}
+
+# 自动生成的配置ID格式
+_PROMPT_ID_RE = re.compile(r"Prompt_(\d+)")
 
 class ConfigManager:
     """配置管理器"""
@@ -123,21 +509,22 @@ class ConfigManager:
     def __init__(self, config_path: str = ".octool_cli/config.yaml"):
         self.config_path = config_path
         self.configs = {}
+        self._lookup_idx: Dict[str, str] = {}  # 名称或别名 -> 配置ID
+        self._used_indices: set = set()       # 已占用的 Prompt_### 编号
+        self._field_cache: Dict[Tuple[str, str], Dict[str, str]] = {}  # (字段, 语言) -> {配置ID: 值}
         self.default_config_id = "Prompt_000"
+        self._content_digest: Optional[str] = None  # 配置文件内容的SHA-256，用于跳过无变化的保存
         self.ensure_config_dir()
         self.load_configs()
     
     def get_multilang_field(self, config: Dict[str, Any], field_base: str, language: str = None) -> str:
         """获取多语言字段值，支持向后兼容"""
         if language is None:
-            from i18n import get_language
             language = get_language()
         
         # 根据语言选择字段
-        if language == 'en-US':
-            field_key = f"{field_base}_en"
-        else:
-            field_key = f"{field_base}_cn"
+        is_en = language == 'en-US'
+        field_key = f"{field_base}_en" if is_en else f"{field_base}_cn"
         
         # 尝试获取多语言字段
         if field_key in config:
@@ -148,11 +535,39 @@ class ConfigManager:
             return config[field_base]
         
         # 提供默认值
-        defaults = {
-            'name': '默认' if language != 'en-US' else 'Default',
-            'welcome_message': '我可以帮你写代码、读文件、写作各种创意内容，请把你的任务交给我吧~' if language != 'en-US' else 'I can help you write code, read files, and write all kinds of creative content, please leave your task to me~'
-        }
-        return defaults.get(field_base, '')
+        return _MULTILANG_DEFAULTS.get((field_base, is_en), '')
+    
+    def get_config_field(self, config_id: str, field_base: str) -> str:
+        """获取指定配置在当前语言下的多语言字段值，结果按语言缓存
+        
+        Args:
+            config_id: 配置ID
+            field_base: 字段基础名（如 name、welcome_message）
+            
+        Returns:
+            字段值，配置不存在时返回空字符串
+        """
+        language = get_language()
+        values = self._field_cache.setdefault((field_base, language), {})
+        value = values.get(config_id)
+        if value is None:
+            config = self.configs.get(config_id)
+            if config is None:
+                return ''
+            value = values[config_id] = self.get_multilang_field(config, field_base, language)
+        return value
+    
+    def _resolved_names(self) -> Dict[str, str]:
+        """获取当前语言下各配置的显示名称，缓存不完整时整体计算"""
+        language = get_language()
+        names = self._field_cache.get(('name', language))
+        # 缓存中只会有已存在的配置ID，数量相同即说明已完整
+        if names is None or len(names) != len(self.configs):
+            names = self._field_cache[('name', language)] = {
+                config_id: self.get_multilang_field(config, 'name', language)
+                for config_id, config in self.configs.items()
+            }
+        return names
     
     def ensure_config_dir(self):
         """确保配置目录存在"""
@@ -160,21 +575,78 @@ class ConfigManager:
         if config_dir and not os.path.exists(config_dir):
             os.makedirs(config_dir, exist_ok=True)
     
+    @property
+    def sidecar_path(self) -> str:
+        """解析结果的JSON缓存文件路径"""
+        return self.config_path + '.json'
+    
+    def _read_sidecar(self, st: os.stat_result, digest: str) -> Optional[Dict[str, Any]]:
+        """读取JSON缓存，仅当其不早于YAML且内容哈希一致时有效"""
+        try:
+            if os.stat(self.sidecar_path).st_mtime < st.st_mtime:
+                return None
+            with open(self.sidecar_path, 'r', encoding='utf-8') as f:
+                sidecar = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # 手动编辑YAML可能不会更新mtime，因此再核对内容哈希
+        if (not isinstance(sidecar, dict) or sidecar.get('content-version') != digest
+                or sidecar.get('schema') != _SIDECAR_SCHEMA):
+            return None
+        data = sidecar.get('data')
+        return data if isinstance(data, dict) else None
+    
+    def _write_sidecar(self, data: Dict[str, Any], digest: str) -> None:
+        """写入JSON缓存，失败时删除旧缓存以免误用"""
+        try:
+            with open(self.sidecar_path, 'w', encoding='utf-8') as f:
+                json.dump({'schema': _SIDECAR_SCHEMA, 'content-version': digest, 'data': data}, f, ensure_ascii=False)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(self.sidecar_path)
+            except OSError:
+                pass
+    
     def load_configs(self) -> bool:
         """加载配置文件"""
         try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
-                
-                # 提取默认配置ID
-                self.default_config_id = data.pop('default_config', 'Prompt_000')
-                
-                # 加载所有配置
-                self.configs = {k: v for k, v in data.items() if isinstance(v, dict)}
-                
-                return True
-            return False
+            path = os.path.abspath(self.config_path)
+            try:
+                fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            except FileNotFoundError:
+                return False
+            
+            try:
+                st = os.fstat(fd)
+                cached = _YAML_CACHE.get(path)
+                if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+                    # 文件未变化，直接使用缓存的解析结果
+                    _YAML_CACHE.move_to_end(path)
+                    data = copy.deepcopy(cached[2])
+                    digest = cached[3]
+                else:
+                    raw = _read_fd(fd, st.st_size)
+                    digest = hashlib.sha256(raw).hexdigest()
+                    data = self._read_sidecar(st, digest)
+                    if data is None:
+                        # JSON缓存缺失或过期，解析YAML并回写缓存
+                        # 直接把字节交给解析器（自行识别BOM与编码），省去中间的str副本
+                        data = _normalize_config_data(yaml.load(raw, Loader=_yaml_io()[0]))
+                        self._write_sidecar(data, digest)
+                    _yaml_cache_put(path, st, copy.deepcopy(data), digest)
+            finally:
+                os.close(fd)
+            
+            self._content_digest = digest
+            
+            # 提取默认配置ID
+            self.default_config_id = data.pop('default_config', 'Prompt_000')
+            
+            # 加载所有配置（数据在解析时已规范化，缓存中的数据无需再次检查）
+            self.configs = data
+            self._rebuild_index()
+            
+            return True
         except Exception as e:
             print(f"{COLOR_RED}配置加载失败: {str(e)}{COLOR_RESET}")
             return False
@@ -185,8 +657,25 @@ class ConfigManager:
             data = dict(self.configs)
             data['default_config'] = self.default_config_id
             
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(data, f, allow_unicode=True, default_flow_style=False)
+            raw = yaml.dump(data, Dumper=_yaml_io()[1], allow_unicode=True, default_flow_style=False).encode('utf-8')
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest == self._content_digest and os.path.exists(self.config_path):
+                # 内容与文件中的一致，无需重写
+                return True
+            
+            # 先写入临时文件并落盘再替换，避免写入中断导致配置文件损坏
+            tmp_path = self.config_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
+            self._content_digest = digest
+            self._write_sidecar(data, digest)
+            
+            # 用刚写入的数据更新缓存，无需重新解析
+            path = os.path.abspath(self.config_path)
+            _yaml_cache_put(path, os.stat(path), copy.deepcopy(data), digest)
             return True
         except Exception as e:
             print(f"{COLOR_RED}配置保存失败: {str(e)}{COLOR_RESET}")
@@ -196,36 +685,59 @@ class ConfigManager:
         """获取指定配置"""
         return self.configs.get(config_id)
     
-    def get_config_by_name_or_alias(self, identifier: str) -> Optional[tuple]:
-        """通过名称或别名获取配置"""
+    def _rebuild_index(self) -> None:
+        """重建名称和别名索引
+        
+        按配置顺序依次登记每个配置的名称和别名，重复时保留先出现的配置，
+        与逐个配置同时比较名称和别名的查找顺序一致。
+        """
+        self._lookup_idx = {}
+        self._used_indices = set()
+        self._field_cache = {}  # 配置变化后重新解析多语言字段
         for config_id, config in self.configs.items():
-            if config.get('name') == identifier:
-                return config_id, config
+            match = _PROMPT_ID_RE.fullmatch(config_id)
+            if match:
+                self._used_indices.add(int(match.group(1)))
+            
+            name = config.get('name')
+            if isinstance(name, str):
+                self._lookup_idx.setdefault(name, config_id)
             
             aliases = config.get('alias', [])
-            if isinstance(aliases, list) and identifier in aliases:
-                return config_id, config
-        
-        return None
+            if isinstance(aliases, list):
+                for alias in aliases:
+                    if isinstance(alias, str):
+                        self._lookup_idx.setdefault(alias, config_id)
+    
+    def next_prompt_id(self) -> str:
+        """获取最小的未占用配置ID（Prompt_###）"""
+        i = 0
+        while i in self._used_indices:
+            i += 1
+        return f"Prompt_{i:03d}"
+    
+    def get_config_by_name_or_alias(self, identifier: str) -> Optional[tuple]:
+        """通过名称或别名获取配置"""
+        config_id = self._lookup_idx.get(identifier)
+        return (config_id, self.configs[config_id]) if config_id else None
     
     def list_configs(self) -> List[tuple]:
         """列出所有配置"""
-        result = []
-        for config_id, config in self.configs.items():
-            name = self.get_multilang_field(config, 'name')
-            aliases = config.get('alias', [])
-            result.append((config_id, name, aliases))
-        return result
+        names = self._resolved_names()
+        return [(config_id, names[config_id], config.get('alias', []))
+                for config_id, config in self.configs.items()]
     
     def add_config(self, config_id: str, config_data: Dict[str, Any]) -> bool:
         """添加新配置"""
         self.configs[config_id] = config_data
+        self._rebuild_index()
         return self.save_configs()
     
     def delete_config(self, config_id: str) -> bool:
         """删除配置"""
         if config_id in self.configs:
             del self.configs[config_id]
+            self._rebuild_index()
             return self.save_configs()
         return False
     
@@ -240,19 +752,98 @@ class ConfigManager:
         """更新指定配置"""
         if config_id in self.configs:
             self.configs[config_id] = config_data
+            self._rebuild_index()
             return self.save_configs()
         return False
     
+# 兼容前缀匹配的命令前缀，顺序与 ChatTool._cmd_prefix_table 一致
+_CMD_PREFIXES = ('/lang', '/markdown', '/stream')
+
+# 开关类命令接受的选项
+_TOGGLE_ON = frozenset(('on', 'enable', '开启', '启用'))
+_TOGGLE_OFF = frozenset(('off', 'disable', '关闭', '禁用'))
+
+# 交互式配置中使用的提示文本键
+_CONFIG_INPUT_KEYS = (
+    'input.api_endpoint_prompt', 'input.config_name_prompt', 'input.name_cn', 'input.name_en',
+    'input.alias_prompt', 'input.model_prompt', 'input.ai_name_prompt', 'input.system_prompt_prompt',
+    'input.welcome_message_cn', 'input.welcome_message_en', 'input.enable_history_prompt',
+    'input.enable_summary_prompt', 'input.max_tokens_prompt', 'input.enable_stream_prompt',
+    'input.enable_markdown_prompt',
+)
+
+# 极简模式需要的配置项及其内置默认值
+_SIMPLE_MODE_KEYS = ('API_key', 'API_endpoint', 'model')
+_SIMPLE_MODE_DEFAULTS = {
+    'API_key': 'your_api_key_here',
+    'API_endpoint': 'https://api.deepseek.com',
+    'model': 'deepseek-chat',
+}
+
+# API验证结果的有效期（秒），期内同一组密钥和端点不再发起验证请求
+API_VALIDATION_TTL = 7 * 86400
+
+def _api_fingerprint(api_key: str, api_endpoint: str) -> str:
+    """计算密钥和端点的指纹，验证记录中不保存明文密钥"""
+    return hashlib.sha256(f"{api_key}\0{api_endpoint}".encode('utf-8')).hexdigest()
+
+# 按语言缓存的预组合文本：语言 -> (帮助信息, /config用法)
+_TEMPLATE_CACHE: Dict[str, Tuple[str, str]] = {}
+
 class ChatTool:
     """聊天工具主类"""
     
-    def __init__(self):
-        self.config_manager = ConfigManager()
+    def __init__(self, config_manager: Optional[ConfigManager] = None):
+        self._config_manager = config_manager  # 为None时首次访问才创建
+        self._validated_keys = set()  # 已验证通过的 (API_key, API_endpoint)
+        self._clients: Dict[Tuple[str, str], Any] = {}  # (API_key, API_endpoint) -> OpenAI客户端
+        self._pending_validation = None  # 后台验证：((API_key, API_endpoint), 线程, 结果)
+        self._validation_stamps: Optional[Dict[str, float]] = None  # 指纹 -> 上次验证通过的时间
         self.current_config = None
         self.current_config_id = None
         self.client = None
         self.history_manager = None
         self.summarizer = None
+        self._prompt_cache_key = None
+        self._prompt_text = ""
+        self._system_message_key = None
+        self._system_message: Dict[str, str] = {}
+        
+        # 命令分发表
+        self._cmd_table = {
+            '/help': self._cmd_help,
+            '/clear': self._cmd_clear,
+            '/exit': self._cmd_exit,
+            '/lang': self._cmd_lang,
+            '/markdown': self._cmd_markdown,
+            '/stream': self._cmd_stream,
+            '/config': self._cmd_config,
+            '/history': self._cmd_history,
+            '/new': self._cmd_new,
+            '/summary': self._cmd_summary,
+            '/last_summary': self._cmd_last_summary,
+            '/refresh': self._cmd_refresh,
+            '/version': self._cmd_version,
+        }
+        self._cmd_prefix_table = (
+            ('/lang', self._cmd_lang),
+            ('/markdown', self._cmd_markdown),
+            ('/stream', self._cmd_stream),
+        )
+        
+        register_command_words(self._cmd_table)
+        
+        # 预先组合的带颜色模板，首次使用或语言变化时构建
+        self._templates_lang = None
+    
+    def _build_templates(self) -> None:
+        """按当前语言预先组合帮助信息等静态带颜色文本"""
+        lang = get_language()
+        self._templates_lang = lang
+        cached = _TEMPLATE_CACHE.get(lang)
+        if cached:
+            self.help_msg, self._fmt_config_usage = cached
+            return
         
         # 帮助信息
         self.help_msg = f"""{COLOR_YELLOW}{t('commands.help_title')}{COLOR_BLUE}
@@ -273,23 +864,41 @@ class ChatTool:
 - '/lang [language]': {t('commands.lang_desc')}
 - '/markdown [on/off]': {t('commands.markdown_desc')}
 {COLOR_RESET}"""
+        
+        # /config 用法说明
+        self._fmt_config_usage = "\n".join([
+            f"{COLOR_YELLOW}{t('config.usage_title')}{COLOR_BLUE}",
+            f"- /config list: {t('config.list_usage')}",
+            f"- /config switch [ID]: {t('config.switch_usage')}",
+            f"- /config new [ID]: {t('config.new_usage')}",
+            f"- /config edit [ID]: {t('config.edit_usage')}",
+            f"- /config delete [ID]: {t('config.delete_usage')}",
+            f"- /config current: {t('config.current_usage')}{COLOR_RESET}",
+        ])
+        _TEMPLATE_CACHE[lang] = (self.help_msg, self._fmt_config_usage)
+    
+    def _ensure_templates(self) -> None:
+        """语言切换后重建预组合模板"""
+        if self._templates_lang != get_language():
+            self._build_templates()
+    
+    @property
+    def config_manager(self) -> ConfigManager:
+        """配置管理器，首次访问时才读取配置文件"""
+        if self._config_manager is None:
+            self._config_manager = ConfigManager()
+        return self._config_manager
     
     def _parse_token_value(self, token_input: str, default_value: int) -> int:
         """解析Token值，支持K/k单位"""
-        if not token_input:
-            return default_value
-        
-        token_input = token_input.strip().upper()
-        
-        try:
-            if token_input.endswith('K'):
-                # 移除K并转换为数字，然后乘以1000
-                number = float(token_input[:-1])
-                return int(number * 1000)
-            else:
-                return int(token_input)
-        except ValueError:
-            return default_value
+        return parse_token_value(token_input, default_value)
+    
+    def _max_tokens(self, default_value: int) -> int:
+        """获取当前配置的最大Token数（加载时已规范化为整数）"""
+        value = self.current_config.get('max_tokens', default_value)
+        if isinstance(value, int):
+            return value
+        return parse_token_value(str(value), default_value)
     
     def select_initial_language(self):
         """首次使用时选择语言"""
@@ -310,74 +919,187 @@ class ChatTool:
             else:
                 print(f"{COLOR_RED}Invalid choice, please enter 1 or 2 / 无效选择，请输入 1 或 2{COLOR_RESET}")
     
-    def validate_api(self, api_key: str, api_endpoint: str) -> bool:
-        """验证API有效性"""
+    @staticmethod
+    def _probe_client(client) -> Optional[str]:
+        """通过列出模型探测客户端是否可用，不输出任何内容
+        
+        Returns:
+            失败时返回错误信息，成功时返回None
+        """
         try:
-            from openai import OpenAI  # 延迟导入
-            client = OpenAI(api_key=api_key, base_url=api_endpoint)
             client.models.list()
-            return True
+            return None
+        except Exception as e:
+            return str(e)
+    
+    def _check_client(self, client) -> bool:
+        """通过列出模型检查客户端是否可用"""
+        error = self._probe_client(client)
+        if error is not None:
+            print(f"{COLOR_RED}{t('api.validation_failed', error=error)}{COLOR_RESET}")
+        return error is None
+    
+    @property
+    def validation_path(self) -> str:
+        """API验证记录文件路径（与配置文件同目录）"""
+        return os.path.join(os.path.dirname(self.config_manager.config_path), 'api_validation.json')
+    
+    def _load_validation_stamps(self) -> Dict[str, float]:
+        """读取API验证记录，首次访问时从文件加载"""
+        if self._validation_stamps is None:
+            try:
+                with open(self.validation_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._validation_stamps = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._validation_stamps = {}
+        return self._validation_stamps
+    
+    def _recently_validated(self, api_key: str, api_endpoint: str) -> bool:
+        """该组密钥和端点是否在有效期内验证通过过"""
+        stamp = self._load_validation_stamps().get(_api_fingerprint(api_key, api_endpoint))
+        return isinstance(stamp, (int, float)) and time.time() - stamp < API_VALIDATION_TTL
+    
+    def _record_validation(self, api_key: str, api_endpoint: str, valid: bool) -> None:
+        """记录验证结果：通过时更新时间，失败时删除记录"""
+        stamps = self._load_validation_stamps()
+        fingerprint = _api_fingerprint(api_key, api_endpoint)
+        if valid:
+            stamps[fingerprint] = time.time()
+        elif stamps.pop(fingerprint, None) is None:
+            return
+        try:
+            with open(self.validation_path, 'w', encoding='utf-8') as f:
+                json.dump(stamps, f)
+        except OSError:
+            pass
+    
+    def _handle_request_error(self, error: Exception, api_key: str, api_endpoint: str) -> None:
+        """请求因认证失败时清除验证记录，下次使用时重新验证"""
+        auth_error = getattr(openai, 'AuthenticationError', None)
+        if auth_error is not None and isinstance(error, auth_error):
+            self._validated_keys.discard((api_key, api_endpoint))
+            self._record_validation(api_key, api_endpoint, False)
+    
+    def _start_background_validation(self) -> None:
+        """在后台线程中验证当前客户端，与用户输入第一条消息的时间重叠"""
+        key = (self.current_config.get('API_key'), self.current_config.get('API_endpoint'))
+        if key not in self._validated_keys and self._recently_validated(*key):
+            self._validated_keys.add(key)
+        if key in self._validated_keys or self.client is None:
+            self._pending_validation = None
+            return
+        
+        client = self.client
+        result: Dict[str, Optional[str]] = {}
+        
+        def probe():
+            result['error'] = self._probe_client(client)
+        
+        # 守护线程：退出程序时不等待网络请求结束
+        thread = threading.Thread(target=probe, daemon=True)
+        thread.start()
+        self._pending_validation = (key, thread, result)
+    
+    def _get_client(self, api_key: str, api_endpoint: str):
+        """获取指定密钥和端点的OpenAI客户端，相同参数复用同一实例以保持连接
+        
+        Returns:
+            OpenAI客户端
+        """
+        key = (api_key, api_endpoint)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = openai.OpenAI(api_key=api_key, base_url=api_endpoint)
+        return client
+    
+    def _build_and_validate_client(self, api_key: str, api_endpoint: str, force: bool = False):
+        """获取客户端并验证API，成功时返回该客户端以便直接复用
+        
+        Args:
+            api_key: API密钥
+            api_endpoint: API端点
+            force: 为True时忽略验证记录，总是发起验证请求
+        
+        Returns:
+            验证通过的OpenAI客户端，失败时返回None
+        """
+        try:
+            client = self._get_client(api_key, api_endpoint)
         except Exception as e:
             print(f"{COLOR_RED}{t('api.validation_failed', error=str(e))}{COLOR_RESET}")
-            return False
+            return None
+        
+        # 有效期内验证通过过的密钥不再发起验证请求，认证失败会在实际请求时暴露
+        if not force and self._recently_validated(api_key, api_endpoint):
+            return client
+        
+        valid = self._check_client(client)
+        self._record_validation(api_key, api_endpoint, valid)
+        return client if valid else None
+    
+    def validate_api(self, api_key: str, api_endpoint: str) -> bool:
+        """验证API有效性"""
+        return self._build_and_validate_client(api_key, api_endpoint) is not None
     
     def input_config_interactive(self, config_id: str = None) -> Optional[Dict[str, Any]]:
         """交互式配置输入"""
-        print(f"{COLOR_YELLOW}{t('input.enter_config_info')}{COLOR_RESET}")
+        # 预先组合所有带颜色的提示文本
+        prompts = {key: f"{COLOR_YELLOW}{t(key)}{COLOR_RESET}" for key in _CONFIG_INPUT_KEYS}
+        
+        def ask(key: str) -> str:
+            return read_line(prompts[key]).strip()
+        
+        print(_ct(COLOR_YELLOW, 'input.enter_config_info'))
         
         # API配置
         while True:
-            api_key = input(f"{COLOR_YELLOW}API Key: {COLOR_RESET}").strip()
+            api_key = read_line(f"{COLOR_YELLOW}API Key: {COLOR_RESET}").strip()
             if not api_key:
                 continue
             
-            api_endpoint = input(f"{COLOR_YELLOW}{t('input.api_endpoint_prompt')}{COLOR_RESET}").strip()
+            api_endpoint = ask('input.api_endpoint_prompt')
             if not api_endpoint:
                 api_endpoint = "https://api.deepseek.com"
             
-            print(f"{COLOR_GREEN}{t('api.validating')}{COLOR_RESET}")
+            print(_ct(COLOR_GREEN, 'api.validating'))
             if self.validate_api(api_key, api_endpoint):
-                print(f"{COLOR_GREEN}{t('api.validation_success')}{COLOR_RESET}")
+                self._validated_keys.add((api_key, api_endpoint))
+                print(_ct(COLOR_GREEN, 'api.validation_success'))
                 break
             else:
-                print(f"{COLOR_RED}{t('api.validation_failed_retry')}{COLOR_RESET}")
+                print(_ct(COLOR_RED, 'api.validation_failed_retry'))
         
         # 其他配置
-        name = input(f"{COLOR_YELLOW}{t('input.config_name_prompt')}{COLOR_RESET}").strip() or "default"
+        name = ask('input.config_name_prompt') or "default"
         
         # 多语言配置名称
-        name_cn = input(f"{COLOR_YELLOW}{t('input.name_cn')}{COLOR_RESET}").strip() or name
-        name_en = input(f"{COLOR_YELLOW}{t('input.name_en')}{COLOR_RESET}").strip() or name
+        name_cn = ask('input.name_cn') or name
+        name_en = ask('input.name_en') or name
         
-        alias_input = input(f"{COLOR_YELLOW}{t('input.alias_prompt')}{COLOR_RESET}").strip()
+        alias_input = ask('input.alias_prompt')
         aliases = [a.strip() for a in alias_input.split(',') if a.strip()] if alias_input else []
         
-        model = input(f"{COLOR_YELLOW}{t('input.model_prompt')}{COLOR_RESET}").strip() or "deepseek-chat"
-        ai_name = input(f"{COLOR_YELLOW}{t('input.ai_name_prompt')}{COLOR_RESET}").strip() or "AI"
-        system_prompt = input(f"{COLOR_YELLOW}{t('input.system_prompt_prompt')}{COLOR_RESET}").strip() or t('input.default_system_prompt')
+        model = ask('input.model_prompt') or "deepseek-chat"
+        ai_name = ask('input.ai_name_prompt') or "AI"
+        system_prompt = ask('input.system_prompt_prompt') or t('input.default_system_prompt')
         
         # 多语言欢迎消息
-        welcome_message_cn = input(f"{COLOR_YELLOW}{t('input.welcome_message_cn')}{COLOR_RESET}").strip() or "我可以帮你写代码、读文件、写作各种创意内容，请把你的任务交给我吧~"
-        welcome_message_en = input(f"{COLOR_YELLOW}{t('input.welcome_message_en')}{COLOR_RESET}").strip() or "I can help you write code, read files, and write all kinds of creative content, please leave your task to me~"
+        welcome_message_cn = ask('input.welcome_message_cn') or _MULTILANG_DEFAULTS[('welcome_message', False)]
+        welcome_message_en = ask('input.welcome_message_en') or _MULTILANG_DEFAULTS[('welcome_message', True)]
         
         # 功能配置
-        history_input = input(f"{COLOR_YELLOW}{t('input.enable_history_prompt')}{COLOR_RESET}").strip().lower()
-        history = history_input != 'n'
-        
-        summary_input = input(f"{COLOR_YELLOW}{t('input.enable_summary_prompt')}{COLOR_RESET}").strip().lower()
-        summary = summary_input != 'n' and history  # 总结需要历史记录支持
+        history = ask('input.enable_history_prompt').lower() != 'n'
+        summary = ask('input.enable_summary_prompt').lower() != 'n' and history  # 总结需要历史记录支持
         
         # Token配置 - 支持K/k单位
-        max_tokens_input = input(f"{COLOR_YELLOW}{t('input.max_tokens_prompt')}{COLOR_RESET}").strip()
-        max_tokens = self._parse_token_value(max_tokens_input, 64000)  # 默认64K
+        max_tokens = self._parse_token_value(ask('input.max_tokens_prompt'), 64000)  # 默认64K
         
         # 流式响应配置
-        stream_input = input(f"{COLOR_YELLOW}{t('input.enable_stream_prompt')}{COLOR_RESET}").strip().lower()
-        stream = stream_input != 'n'  # 默认启用流式响应
+        stream = ask('input.enable_stream_prompt').lower() != 'n'  # 默认启用流式响应
         
         # Markdown渲染配置
-        markdown_input = input(f"{COLOR_YELLOW}{t('input.enable_markdown_prompt')}{COLOR_RESET}").strip().lower()
-        markdown = markdown_input != 'n'  # 默认启用Markdown渲染
+        markdown = ask('input.enable_markdown_prompt').lower() != 'n'  # 默认启用Markdown渲染
         
         return {
             'name': name,
@@ -399,8 +1121,45 @@ class ChatTool:
             'language': get_language()
         }
     
-    def load_config(self, config_id: str) -> bool:
-        """加载指定配置"""
+    def ensure_api_valid(self) -> bool:
+        """验证当前配置的API，每组密钥和端点只验证一次
+        
+        Returns:
+            API是否有效
+        """
+        if not self.current_config:
+            return False
+        
+        key = (self.current_config.get('API_key'), self.current_config.get('API_endpoint'))
+        if key in self._validated_keys:
+            return True
+        
+        pending, self._pending_validation = self._pending_validation, None
+        if pending is not None and pending[0] == key:
+            # 等待后台验证结果（通常在用户输入期间已经完成）
+            _, thread, result = pending
+            thread.join()
+            error = result.get('error')
+            if error is not None:
+                print(f"{COLOR_RED}{t('api.validation_failed', error=error)}{COLOR_RESET}")
+            valid = error is None
+            self._record_validation(*key, valid)
+        elif self.client is not None:
+            # 复用已创建的客户端进行验证，不再额外创建连接
+            valid = self._check_client(self.client)
+            self._record_validation(*key, valid)
+        else:
+            # validate_api 会自行记录验证结果
+            valid = self.validate_api(*key)
+        if not valid:
+            print(f"{COLOR_RED}{t('config.invalid_api', name=self.current_config_id)}{COLOR_RESET}")
+            return False
+        
+        self._validated_keys.add(key)
+        return True
+    
+    def bind_config(self, config_id: str) -> bool:
+        """加载指定配置并创建客户端，API验证在后台进行，首次请求前等待结果"""
         config = self.config_manager.get_config(config_id)
         if not config:
             # 尝试通过名称或别名查找
@@ -415,7 +1174,7 @@ class ChatTool:
         language = config.get('language', 'zh-CN')
         set_language(language)
         
-        # 验证API
+        # 检查API信息
         api_key = config.get('API_key')
         api_endpoint = config.get('API_endpoint')
         
@@ -423,17 +1182,14 @@ class ChatTool:
             print(f"{COLOR_RED}{t('config.missing_api_info', name=config_id)}{COLOR_RESET}")
             return False
         
-        if not self.validate_api(api_key, api_endpoint):
-            print(f"{COLOR_RED}{t('config.invalid_api', name=config_id)}{COLOR_RESET}")
-            return False
-        
         # 设置当前配置
         self.current_config = config
         self.current_config_id = config_id
+        self._refresh_turn_settings()
         
-        # 延迟导入OpenAI
-        from openai import OpenAI
-        self.client = OpenAI(api_key=api_key, base_url=api_endpoint)
+        # 相同密钥和端点复用已有客户端及其连接池
+        self.client = self._get_client(api_key, api_endpoint)
+        self._start_background_validation()
         
         # 初始化历史记录管理器
         if config.get('history', False):
@@ -443,31 +1199,25 @@ class ChatTool:
             self.history_manager.model = config.get('model', 'deepseek-chat')
             
             # 添加系统消息（确保包含时间信息并处理模板变量）
-            system_prompt = config.get('system_Prompt', '')
-            enhanced_prompt = ensure_datetime_in_prompt(system_prompt)
-            processed_prompt = process_template(enhanced_prompt)
+            processed_prompt = build_system_prompt(config.get('system_Prompt', ''))
             self.history_manager.add_message('system', processed_prompt)
         
         # 初始化总结器
         if config.get('summary', False) and config.get('history', False):
             # 延迟导入summary模块
             from summary import create_summarizer
-            self.summarizer = create_summarizer(api_key, api_endpoint, config.get('model', 'deepseek-chat'))
+            self.summarizer = create_summarizer(api_key, api_endpoint, config.get('model', 'deepseek-chat'),
+                                                client=self.client)
         
-        config_name = self.config_manager.get_multilang_field(config, 'name')
+        config_name = self.config_manager.get_config_field(config_id, 'name')
         print(f"{COLOR_GREEN}{t('config.loaded', name=config_name, id=config_id)}{COLOR_RESET}")
         return True
     
     def handle_config_command(self, parts: List[str]) -> bool:
         """处理配置相关命令"""
         if len(parts) < 2:
-            print(f"{COLOR_YELLOW}{t('config.usage_title')}{COLOR_BLUE}")
-            print(f"- /config list: {t('config.list_usage')}")
-            print(f"- /config switch [ID]: {t('config.switch_usage')}")
-            print(f"- /config new [ID]: {t('config.new_usage')}")
-            print(f"- /config edit [ID]: {t('config.edit_usage')}")
-            print(f"- /config delete [ID]: {t('config.delete_usage')}")
-            print(f"- /config current: {t('config.current_usage')}{COLOR_RESET}")
+            self._ensure_templates()
+            print(self._fmt_config_usage)
             return True
         
         subcommand = parts[1].lower()
@@ -475,33 +1225,31 @@ class ChatTool:
         if subcommand == 'list':
             configs = self.config_manager.list_configs()
             if not configs:
-                print(f"{COLOR_YELLOW}{t('config.no_configs_available')}{COLOR_RESET}")
+                print(_ct(COLOR_YELLOW, 'config.no_configs_available'))
             else:
-                print(f"{COLOR_YELLOW}{t('config.available_configs')}{COLOR_RESET}")
+                alias_label = t('config.alias_label')
+                current_label = f" [{t('config.current_label')}]"
+                lines = [_ct(COLOR_YELLOW, 'config.available_configs')]
                 for config_id, name, aliases in configs:
-                    alias_str = f" ({t('config.alias_label')}: {', '.join(aliases)})" if aliases else ""
-                    current_mark = f" [{t('config.current_label')}]" if config_id == self.current_config_id else ""
-                    print(f"{COLOR_BLUE}- {config_id}: {name}{alias_str}{current_mark}{COLOR_RESET}")
+                    alias_str = f" ({alias_label}: {', '.join(aliases)})" if aliases else ""
+                    current_mark = current_label if config_id == self.current_config_id else ""
+                    lines.append(f"{COLOR_BLUE}- {config_id}: {name}{alias_str}{current_mark}{COLOR_RESET}")
+                write_lines(lines)
         
         elif subcommand == 'switch':
             if len(parts) < 3:
-                print(f"{COLOR_RED}{t('config.specify_config_id')}{COLOR_RESET}")
+                print(_ct(COLOR_RED, 'config.specify_config_id'))
                 return True
             
             config_id = parts[2]
-            if self.load_config(config_id):
+            if self.bind_config(config_id):
                 print(f"{COLOR_GREEN}{t('config.switched_to', id=config_id)}{COLOR_RESET}")
             
         elif subcommand == 'new':
             config_id = parts[2] if len(parts) > 2 else None
             if not config_id:
                 # 自动生成配置ID
-                existing_ids = list(self.config_manager.configs.keys())
-                for i in range(1000):
-                    test_id = f"Prompt_{i:03d}"
-                    if test_id not in existing_ids:
-                        config_id = test_id
-                        break
+                config_id = self.config_manager.next_prompt_id()
             
             if config_id in self.config_manager.configs:
                 print(f"{COLOR_RED}{t('config.already_exists', id=config_id)}{COLOR_RESET}")
@@ -515,131 +1263,127 @@ class ChatTool:
                     print(f"{COLOR_GREEN}{t('config.created_success', id=config_id)}{COLOR_RESET}")
                     
                     # 询问是否切换
-                    switch = input(f"{COLOR_YELLOW}{t('config.switch_to_new_prompt')}{COLOR_RESET}").strip().lower()
+                    switch = input(_ct(COLOR_YELLOW, 'config.switch_to_new_prompt')).strip().lower()
                     if switch == 'y':
-                        self.load_config(config_id)
+                        self.bind_config(config_id)
                 else:
-                    print(f"{COLOR_RED}{t('config.save_failed')}{COLOR_RESET}")
+                    print(_ct(COLOR_RED, 'config.save_failed'))
         
         elif subcommand == 'current':
             if self.current_config:
                 config = self.current_config
-                print(f"{COLOR_YELLOW}{t('config.current_info_title')}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}ID: {self.current_config_id}{COLOR_RESET}")
-                config_name = self.config_manager.get_multilang_field(config, 'name')
-                print(f"{COLOR_BLUE}{t('config.name_label')}: {config_name}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('config.ai_name_label')}: {config.get('ai_name', 'AI')}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('config.model_label')}: {config.get('model', 'Unknown')}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('config.history_label')}: {t('config.enabled') if config.get('history') else t('config.disabled')}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('config.summary_label')}: {t('config.enabled') if config.get('summary') else t('config.disabled')}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('config.markdown_label')}: {t('config.enabled') if config.get('markdown', True) else t('config.disabled')}{COLOR_RESET}")
+                config_name = self.config_manager.get_config_field(self.current_config_id, 'name')
+                enabled, disabled = t('config.enabled'), t('config.disabled')
+                write_lines([
+                    _ct(COLOR_YELLOW, 'config.current_info_title'),
+                    f"{COLOR_BLUE}ID: {self.current_config_id}{COLOR_RESET}",
+                    _label('config.name_label', config_name),
+                    _label('config.ai_name_label', config.get('ai_name', 'AI')),
+                    _label('config.model_label', config.get('model', 'Unknown')),
+                    _label('config.history_label', enabled if config.get('history') else disabled),
+                    _label('config.summary_label', enabled if config.get('summary') else disabled),
+                    _label('config.markdown_label', enabled if config.get('markdown', True) else disabled),
+                ])
             else:
-                print(f"{COLOR_RED}{t('config.no_config_loaded')}{COLOR_RESET}")
+                print(_ct(COLOR_RED, 'config.no_config_loaded'))
         
         else:
             print(f"{COLOR_RED}{t('config.unknown_command', command=subcommand)}{COLOR_RESET}")
         
         return True
     
-    def handle_lang_command(self, command: str) -> None:
-        """处理语言切换命令"""
-        from i18n import set_language, get_language, get_available_languages
+    def handle_lang_command(self, parts: List[str]) -> None:
+        """处理语言切换命令
+        
+        Args:
+            parts: 已分词的命令
+        """
+        from i18n import set_language, get_language, AVAILABLE_LANGUAGES, LANGUAGE_CODES
         
-        parts = command.split()
+        available_text = ', '.join(LANGUAGE_CODES)
         
         if len(parts) == 1:
             # 显示当前语言和可用语言
             current_lang = get_language()
-            available_langs = get_available_languages()
-            print(f"{COLOR_CYAN}{t('lang.current_language')}: {current_lang}{COLOR_RESET}")
-            print(f"{COLOR_CYAN}{t('lang.available_languages')}: {', '.join(available_langs)}{COLOR_RESET}")
-            print(f"{COLOR_YELLOW}{t('lang.usage_hint')}{COLOR_RESET}")
-        elif len(parts) == 2:
-            new_lang = parts[1]
-            available_langs = get_available_languages()
+            write_lines([
+                f"{COLOR_CYAN}{t('lang.current_language')}: {current_lang}{COLOR_RESET}",
+                f"{COLOR_CYAN}{t('lang.available_languages')}: {available_text}{COLOR_RESET}",
+                _ct(COLOR_YELLOW, 'lang.usage_hint'),
+            ])
+        elif len(parts) == 2 or (len(parts) == 3 and parts[1] == 'switch'):
+            # 支持 /lang <语言代码> 与 /lang switch <语言代码> 两种格式
+            new_lang = parts[-1]
             
-            if new_lang in available_langs:
-                set_language(new_lang)
-                print(f"{COLOR_GREEN}{t('lang.switched_to', language=new_lang)}{COLOR_RESET}")
-                
-                # 更新当前配置的语言设置
-                if self.current_config and self.current_config_id:
-                    self.current_config['language'] = new_lang
-                    if self.config_manager.update_config(self.current_config_id, self.current_config):
-                        print(f"{COLOR_BLUE}{t('lang.config_updated')}{COLOR_RESET}")
-                    else:
-                        print(f"{COLOR_RED}{t('lang.config_update_failed')}{COLOR_RESET}")
-            else:
-                print(f"{COLOR_RED}{t('lang.unsupported_language', language=new_lang)}{COLOR_RESET}")
-                print(f"{COLOR_YELLOW}{t('lang.available_languages')}: {', '.join(available_langs)}{COLOR_RESET}")
-        elif len(parts) == 3 and parts[1] == 'switch':
-            # 支持 /lang switch <语言代码> 格式
-            new_lang = parts[2]
-            available_langs = get_available_languages()
+            # 先做集合判断，无效输入不触发语言文件加载
+            if new_lang not in AVAILABLE_LANGUAGES:
+                write_lines([
+                    f"{COLOR_RED}{t('lang.unsupported_language', language=new_lang)}{COLOR_RESET}",
+                    f"{COLOR_YELLOW}{t('lang.available_languages')}: {available_text}{COLOR_RESET}",
+                ])
+                return
             
-            if new_lang in available_langs:
-                set_language(new_lang)
-                print(f"{COLOR_GREEN}{t('lang.switched_to', language=new_lang)}{COLOR_RESET}")
-                
-                # 更新当前配置的语言设置
-                if self.current_config and self.current_config_id:
-                    self.current_config['language'] = new_lang
-                    if self.config_manager.update_config(self.current_config_id, self.current_config):
-                        print(f"{COLOR_BLUE}{t('lang.config_updated')}{COLOR_RESET}")
-                    else:
-                        print(f"{COLOR_RED}{t('lang.config_update_failed')}{COLOR_RESET}")
-            else:
-                print(f"{COLOR_RED}{t('lang.unsupported_language', language=new_lang)}{COLOR_RESET}")
-                print(f"{COLOR_YELLOW}{t('lang.available_languages')}: {', '.join(available_langs)}{COLOR_RESET}")
+            set_language(new_lang)
+            print(f"{COLOR_GREEN}{t('lang.switched_to', language=new_lang)}{COLOR_RESET}")
+            
+            # 更新当前配置的语言设置
+            if self.current_config and self.current_config_id:
+                self.current_config['language'] = new_lang
+                if self.config_manager.update_config(self.current_config_id, self.current_config):
+                    print(_ct(COLOR_BLUE, 'lang.config_updated'))
+                else:
+                    print(_ct(COLOR_RED, 'lang.config_update_failed'))
         else:
-            print(f"{COLOR_RED}{t('lang.invalid_usage')}{COLOR_RESET}")
-            print(f"{COLOR_YELLOW}{t('lang.usage_hint')}{COLOR_RESET}")
+            print(_ct(COLOR_RED, 'lang.invalid_usage'))
+            print(_ct(COLOR_YELLOW, 'lang.usage_hint'))
     
     def handle_summary_command(self) -> bool:
         """处理主动总结命令"""
         if not self.history_manager:
-            print(f"{COLOR_RED}{t('summary.history_not_enabled')}{COLOR_RESET}")
+            print(_ct(COLOR_RED, 'summary.history_not_enabled'))
             return True
         
         # 显示历史记录状态
         info = self.history_manager.get_session_info()
-        print(f"{COLOR_YELLOW}{t('summary.status_title')}{COLOR_RESET}")
-        print(f"{COLOR_BLUE}{t('history.session_id_label')}: {info['session_id']}{COLOR_RESET}")
-        print(f"{COLOR_BLUE}{t('history.message_count_label')}: {info['message_count']}{COLOR_RESET}")
-        print(f"{COLOR_BLUE}{t('history.total_tokens_label')}: {info['total_tokens']}{COLOR_RESET}")
+        lines = [
+            _ct(COLOR_YELLOW, 'summary.status_title'),
+            _label('history.session_id_label', info['session_id']),
+            _label('history.message_count_label', info['message_count']),
+            _label('history.total_tokens_label', info['total_tokens']),
+        ]
         
         # 显示总结统计信息
         if self.summarizer:
             stats = self.summarizer.get_summary_stats(self.history_manager.messages)
-            print(f"{COLOR_BLUE}{t('history.summary_count_label')}: {stats['total_summaries']}{COLOR_RESET}")
-            print(f"{COLOR_BLUE}{t('history.compression_ratio_label')}: {stats['compression_ratio']}{COLOR_RESET}")
+            lines.append(_label('history.summary_count_label', stats['total_summaries']))
+            lines.append(_label('history.compression_ratio_label', stats['compression_ratio']))
+        write_lines(lines)
         
         # 检查是否有足够的消息进行总结
         if len(self.history_manager.messages) <= 4:  # system + 至少3条对话
-            print(f"{COLOR_YELLOW}{t('summary.insufficient_messages')}{COLOR_RESET}")
+            print(_ct(COLOR_YELLOW, 'summary.insufficient_messages'))
             return True
         
         # 二次确认
         print(f"\n{COLOR_YELLOW}{t('summary.confirm_prompt')}{COLOR_RESET}")
-        confirm = input(f"{COLOR_CYAN}{t('summary.confirm_input')}{COLOR_RESET}").strip().lower()
+        confirm = input(_ct(COLOR_CYAN, 'summary.confirm_input')).strip().lower()
         
         if confirm not in ['y', 'yes', '是', '确认']:
-            print(f"{COLOR_YELLOW}{t('summary.cancelled')}{COLOR_RESET}")
+            print(_ct(COLOR_YELLOW, 'summary.cancelled'))
             return True
         
         # 执行总结
         try:
             if not self.summarizer:
                 # 即使未开启总结配置，也允许手动总结
+                from summary import create_summarizer
                 api_key = self.current_config.get('API_key')
                 api_endpoint = self.current_config.get('API_endpoint')
                 model = self.current_config.get('model', 'deepseek-chat')
-                self.summarizer = create_summarizer(api_key, api_endpoint, model)
+                self.summarizer = create_summarizer(api_key, api_endpoint, model, client=self.client)
             
             print(f"\n{COLOR_YELLOW}{t('summary.generating')}{COLOR_RESET}")
             
-            max_tokens_raw = self.current_config.get('max_tokens', 64000)
-            max_tokens = self._parse_token_value(str(max_tokens_raw), 64000)
+            max_tokens = self._max_tokens(64000)
             keep_recent = 3  # 保留最近3条消息
         
             summary_msg, new_messages = self.summarizer.summarize_messages(
@@ -647,12 +1391,11 @@ class ChatTool:
             )
             
             if summary_msg:
-                self.history_manager.messages = new_messages
-                self.history_manager.total_tokens = sum(msg.get('tokens', 0) for msg in new_messages)
+                self.history_manager.replace_messages(new_messages, self.summarizer.last_token_total)
                 self.history_manager.save_to_file()
-                print(f"{COLOR_GREEN}{t('summary.manual_completed')}{COLOR_RESET}")
+                print(_ct(COLOR_GREEN, 'summary.manual_completed'))
             else:
-                print(f"{COLOR_RED}{t('summary.failed')}{COLOR_RESET}")
+                print(_ct(COLOR_RED, 'summary.failed'))
         except Exception as e:
             print(f"{COLOR_RED}{t('summary.generation_error', error=str(e))}{COLOR_RESET}")
         
@@ -661,21 +1404,21 @@ class ChatTool:
     def handle_last_summary_command(self) -> bool:
         """处理查看上次总结内容命令"""
         if not self.history_manager:
-            print(f"{COLOR_RED}{t('summary.history_not_enabled')}{COLOR_RESET}")
+            print(_ct(COLOR_RED, 'summary.history_not_enabled'))
             return True
         
         # 查找最近的总结消息
-        summaries = []
-        for msg in reversed(self.history_manager.messages):
-            if msg.get('type') == 'summary' and msg.get('role') == 'system':
-                summaries.append(msg)
-        
-        if not summaries:
-            print(f"{COLOR_YELLOW}{t('summary.no_summaries_found')}{COLOR_RESET}")
+        latest_summary = next(
+            (msg for msg in reversed(self.history_manager.messages)
+             if msg.get('type') == 'summary' and msg.get('role') == 'system'),
+            None
+        )
+        
+        if latest_summary is None:
+            print(_ct(COLOR_YELLOW, 'summary.no_summaries_found'))
             return True
         
         # 显示最近的总结
-        latest_summary = summaries[0]
         content = latest_summary.get('content', '')
         
         # 移除总结前缀
@@ -683,193 +1426,233 @@ class ChatTool:
         if content.startswith(prefix):
             content = content[len(prefix):].strip()
         
-        print(f"{COLOR_YELLOW}{t('summary.last_summary_title')}{COLOR_RESET}")
-        print(f"{COLOR_CYAN}{t('summary.timestamp_label')}: {latest_summary.get('timestamp', 'Unknown')}{COLOR_RESET}")
+        lines = [
+            _ct(COLOR_YELLOW, 'summary.last_summary_title'),
+            f"{COLOR_CYAN}{t('summary.timestamp_label')}: {latest_summary.get('timestamp', 'Unknown')}{COLOR_RESET}",
+        ]
         
         # 显示总结元数据
         metadata = latest_summary.get('summary_metadata', {})
         if metadata:
-            print(f"{COLOR_BLUE}{t('summary.original_messages_label')}: {metadata.get('original_message_count', 'Unknown')}{COLOR_RESET}")
-            print(f"{COLOR_BLUE}{t('summary.original_tokens_label')}: {metadata.get('original_tokens', 'Unknown')}{COLOR_RESET}")
-            print(f"{COLOR_BLUE}{t('summary.summary_tokens_label')}: {metadata.get('summarized_tokens', 'Unknown')}{COLOR_RESET}")
-            print(f"{COLOR_BLUE}{t('summary.compression_ratio_label')}: {metadata.get('compression_ratio', 'Unknown')}{COLOR_RESET}")
+            lines.extend([
+                _label('summary.original_messages_label', metadata.get('original_message_count', 'Unknown')),
+                _label('summary.original_tokens_label', metadata.get('original_tokens', 'Unknown')),
+                _label('summary.summary_tokens_label', metadata.get('summarized_tokens', 'Unknown')),
+                _label('summary.compression_ratio_label', metadata.get('compression_ratio', 'Unknown')),
+            ])
         
-        print(f"\n{COLOR_GREEN}{t('summary.content_label')}:{COLOR_RESET}")
-        print(content)
+        lines.append(f"\n{COLOR_GREEN}{t('summary.content_label')}:{COLOR_RESET}")
+        lines.append(content)
+        write_lines(lines)
         
         return True
     
-    def handle_markdown_command(self, command: str) -> None:
-        """处理Markdown渲染切换命令"""
-        parts = command.split()
-        
+    def _handle_toggle(self, parts: List[str], key: str, ns: str) -> None:
+        """处理开关类命令（如 /markdown、/stream）
+        
+        Args:
+            parts: 已分词的命令
+            key: 配置中的开关字段名
+            ns: i18n文本的命名空间
+        """
         if len(parts) == 1:
-            # 显示当前Markdown渲染状态
-            current_status = self.current_config.get('markdown', True)
-            status_text = t('markdown.enabled') if current_status else t('markdown.disabled')
-            print(f"{COLOR_CYAN}{t('markdown.current_status')}: {status_text}{COLOR_RESET}")
-            print(f"{COLOR_YELLOW}{t('markdown.usage_hint')}{COLOR_RESET}")
+            # 显示当前状态
+            current_status = self.current_config.get(key, True)
+            status_text = t(f'{ns}.enabled') if current_status else t(f'{ns}.disabled')
+            write_lines([
+                f"{COLOR_CYAN}{t(f'{ns}.current_status')}: {status_text}{COLOR_RESET}",
+                _ct(COLOR_YELLOW, f'{ns}.usage_hint'),
+            ])
         elif len(parts) == 2:
             option = parts[1].lower()
             
-            if option in ['on', 'enable', '开启', '启用']:
-                self.current_config['markdown'] = True
-                if self.config_manager.update_config(self.current_config_id, self.current_config):
-                    print(f"{COLOR_GREEN}{t('markdown.enabled_success')}{COLOR_RESET}")
-                else:
-                    print(f"{COLOR_RED}{t('markdown.update_failed')}{COLOR_RESET}")
-            elif option in ['off', 'disable', '关闭', '禁用']:
-                self.current_config['markdown'] = False
+            if option in _TOGGLE_ON or option in _TOGGLE_OFF:
+                enabled = option in _TOGGLE_ON
+                self.current_config[key] = enabled
+                self._refresh_turn_settings()
                 if self.config_manager.update_config(self.current_config_id, self.current_config):
-                    print(f"{COLOR_GREEN}{t('markdown.disabled_success')}{COLOR_RESET}")
+                    success_key = 'enabled_success' if enabled else 'disabled_success'
+                    print(f"{COLOR_GREEN}{t(f'{ns}.{success_key}')}{COLOR_RESET}")
                 else:
-                    print(f"{COLOR_RED}{t('markdown.update_failed')}{COLOR_RESET}")
+                    print(f"{COLOR_RED}{t(f'{ns}.update_failed')}{COLOR_RESET}")
             else:
-                print(f"{COLOR_RED}{t('markdown.invalid_option', option=option)}{COLOR_RESET}")
-                print(f"{COLOR_YELLOW}{t('markdown.usage_hint')}{COLOR_RESET}")
+                print(f"{COLOR_RED}{t(f'{ns}.invalid_option', option=option)}{COLOR_RESET}")
+                print(f"{COLOR_YELLOW}{t(f'{ns}.usage_hint')}{COLOR_RESET}")
         else:
-            print(f"{COLOR_RED}{t('markdown.invalid_usage')}{COLOR_RESET}")
-            print(f"{COLOR_YELLOW}{t('markdown.usage_hint')}{COLOR_RESET}")
+            print(f"{COLOR_RED}{t(f'{ns}.invalid_usage')}{COLOR_RESET}")
+            print(f"{COLOR_YELLOW}{t(f'{ns}.usage_hint')}{COLOR_RESET}")
+    
+    def handle_markdown_command(self, parts: List[str]) -> None:
+        """处理Markdown渲染切换命令"""
+        self._handle_toggle(parts, 'markdown', 'markdown')
     
-    def handle_stream_command(self, command: str) -> None:
+    def handle_stream_command(self, parts: List[str]) -> None:
         """处理流式响应切换命令"""
-        parts = command.split()
-        
-        if len(parts) == 1:
-            # 显示当前流式响应状态
-            current_status = self.current_config.get('stream', True)
-            status_text = t('stream.enabled') if current_status else t('stream.disabled')
-            print(f"{COLOR_CYAN}{t('stream.current_status')}: {status_text}{COLOR_RESET}")
-            print(f"{COLOR_YELLOW}{t('stream.usage_hint')}{COLOR_RESET}")
-        elif len(parts) == 2:
-            option = parts[1].lower()
+        self._handle_toggle(parts, 'stream', 'stream')
+    
+    def _cmd_help(self, user_input: str, parts: List[str]) -> bool:
+        """/help：显示帮助信息"""
+        self._ensure_templates()
+        print(self.help_msg)
+        return True
+    
+    def _cmd_clear(self, user_input: str, parts: List[str]) -> bool:
+        """/clear：清屏并重新显示欢迎信息"""
+        print("\033[H\033[J", end="")  # 清屏
+        self.show_welcome()
+        return True
+    
+    def _cmd_exit(self, user_input: str, parts: List[str]) -> bool:
+        """/exit：保存历史记录并退出"""
+        if self.history_manager:
+            self.history_manager.save_to_file()
+        print(_ct(COLOR_GREEN, 'app.goodbye'))
+        sys.exit(0)
+    
+    def _cmd_config(self, user_input: str, parts: List[str]) -> bool:
+        """/config：配置相关命令"""
+        return self.handle_config_command(parts)
+    
+    def _cmd_history(self, user_input: str, parts: List[str]) -> bool:
+        """/history：显示历史记录状态"""
+        if self.history_manager:
+            info = self.history_manager.get_session_info()
+            lines = [
+                _ct(COLOR_YELLOW, 'history.status_title'),
+                _label('history.session_id_label', info['session_id']),
+                _label('history.message_count_label', info['message_count']),
+                _label('history.total_tokens_label', info['total_tokens']),
+            ]
             
-            if option in ['on', 'enable', '开启', '启用']:
-                self.current_config['stream'] = True
-                if self.config_manager.update_config(self.current_config_id, self.current_config):
-                    print(f"{COLOR_GREEN}{t('stream.enabled_success')}{COLOR_RESET}")
-                else:
-                    print(f"{COLOR_RED}{t('stream.update_failed')}{COLOR_RESET}")
-            elif option in ['off', 'disable', '关闭', '禁用']:
-                self.current_config['stream'] = False
-                if self.config_manager.update_config(self.current_config_id, self.current_config):
-                    print(f"{COLOR_GREEN}{t('stream.disabled_success')}{COLOR_RESET}")
-                else:
-                    print(f"{COLOR_RED}{t('stream.update_failed')}{COLOR_RESET}")
-            else:
-                print(f"{COLOR_RED}{t('stream.invalid_option', option=option)}{COLOR_RESET}")
-                print(f"{COLOR_YELLOW}{t('stream.usage_hint')}{COLOR_RESET}")
+            if self.summarizer:
+                stats = self.summarizer.get_summary_stats(self.history_manager.messages)
+                lines.append(_label('history.summary_count_label', stats['total_summaries']))
+                lines.append(_label('history.compression_ratio_label', stats['compression_ratio']))
+            write_lines(lines)
+        else:
+            print(_ct(COLOR_YELLOW, 'history.not_enabled'))
+        return True
+    
+    def _cmd_new(self, user_input: str, parts: List[str]) -> bool:
+        """/new：开始新的会话"""
+        if self.history_manager:
+            new_session_id = self.history_manager.start_new_session()
+            # 重新添加系统消息（确保包含时间信息并处理模板变量）
+            processed_prompt = build_system_prompt(self.current_config.get('system_Prompt', ''))
+            self.history_manager.add_message('system', processed_prompt)
+            print(f"{COLOR_GREEN}{t('history.new_session_started', session_id=new_session_id)}{COLOR_RESET}")
         else:
-            print(f"{COLOR_RED}{t('stream.invalid_usage')}{COLOR_RESET}")
-            print(f"{COLOR_YELLOW}{t('stream.usage_hint')}{COLOR_RESET}")
+            print(_ct(COLOR_YELLOW, 'history.cannot_create_session'))
+        return True
+    
+    def _cmd_summary(self, user_input: str, parts: List[str]) -> bool:
+        """/summary：主动总结"""
+        return self.handle_summary_command()
+    
+    def _cmd_last_summary(self, user_input: str, parts: List[str]) -> bool:
+        """/last_summary：查看上次总结"""
+        return self.handle_last_summary_command()
+    
+    def _cmd_refresh(self, user_input: str, parts: List[str]) -> bool:
+        """/refresh：重新渲染最近的内容"""
+        markdown_renderer.refresh_display()
+        print(_ct(COLOR_GREEN, 'refresh.completed'))
+        return True
+    
+    def _cmd_version(self, user_input: str, parts: List[str]) -> bool:
+        """/version：显示版本信息"""
+        write_lines([
+            _ct(COLOR_CYAN, 'version.title'),
+            _ct(COLOR_GREEN, 'version.description'),
+            "",
+            f"{COLOR_YELLOW}{t('version.version_info', version=VERSION)}{COLOR_RESET}",
+            _ct(COLOR_BLUE, 'version.repository'),
+        ])
+        return True
+    
+    def _cmd_lang(self, user_input: str, parts: List[str]) -> bool:
+        """/lang：语言切换"""
+        self.handle_lang_command(parts)
+        return True
+    
+    def _cmd_markdown(self, user_input: str, parts: List[str]) -> bool:
+        """/markdown：Markdown渲染开关"""
+        self.handle_markdown_command(parts)
+        return True
+    
+    def _cmd_stream(self, user_input: str, parts: List[str]) -> bool:
+        """/stream：流式响应开关"""
+        self.handle_stream_command(parts)
+        return True
     
     def handle_command(self, user_input: str) -> bool:
         """处理用户命令"""
         if not user_input.startswith('/'):
             return False
         
-        parts = user_input.split()
-        command = parts[0].lower()
-        
-        if command == '/help':
-            print(self.help_msg)
-            return True
-        
-        elif command == '/clear':
-            print("\033[H\033[J", end="")  # 清屏
-            self.show_welcome()
-            return True
-        
-        elif command == '/exit':
-            if self.history_manager:
-                self.history_manager.save_to_file()
-            print(f"{COLOR_GREEN}{t('app.goodbye')}{COLOR_RESET}")
-            sys.exit(0)
-        
-        elif command.startswith('/lang'):
-            self.handle_lang_command(user_input)
-            return True
-        
-        elif command.startswith('/markdown'):
-            self.handle_markdown_command(user_input)
-            return True
-        
-        elif command.startswith('/stream'):
-            self.handle_stream_command(user_input)
-            return True
-        
-        elif command == '/config':
-            return self.handle_config_command(parts)
-        
-        elif command == '/history':
-            if self.history_manager:
-                info = self.history_manager.get_session_info()
-                print(f"{COLOR_YELLOW}{t('history.status_title')}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('history.session_id_label')}: {info['session_id']}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('history.message_count_label')}: {info['message_count']}{COLOR_RESET}")
-                print(f"{COLOR_BLUE}{t('history.total_tokens_label')}: {info['total_tokens']}{COLOR_RESET}")
-                
-                if self.summarizer:
-                    stats = self.summarizer.get_summary_stats(self.history_manager.messages)
-                    print(f"{COLOR_BLUE}{t('history.summary_count_label')}: {stats['total_summaries']}{COLOR_RESET}")
-                    print(f"{COLOR_BLUE}{t('history.compression_ratio_label')}: {stats['compression_ratio']}{COLOR_RESET}")
-            else:
-                print(f"{COLOR_YELLOW}{t('history.not_enabled')}{COLOR_RESET}")
-            return True
-        
-        elif command == '/new':
-            if self.history_manager:
-                new_session_id = self.history_manager.start_new_session()
-                # 重新添加系统消息（确保包含时间信息并处理模板变量）
-                system_prompt = self.current_config.get('system_Prompt', '')
-                enhanced_prompt = ensure_datetime_in_prompt(system_prompt)
-                processed_prompt = process_template(enhanced_prompt)
-                self.history_manager.add_message('system', processed_prompt)
-                print(f"{COLOR_GREEN}{t('history.new_session_started', session_id=new_session_id)}{COLOR_RESET}")
-            else:
-                print(f"{COLOR_YELLOW}{t('history.cannot_create_session')}{COLOR_RESET}")
-            return True
-        
-        elif command == '/summary':
-            return self.handle_summary_command()
-        
-        elif command == '/last_summary':
-            return self.handle_last_summary_command()
-        
-        elif command == '/refresh':
-            from markdown_renderer import refresh_display
-            refresh_display()
-            print(f"{COLOR_GREEN}{t('refresh.completed')}{COLOR_RESET}")
-            return True
+        # 只截取第一个词作为命令，不对整段输入分词
+        command = _COMMAND_RE.match(user_input).group().lower()
         
-        elif command == '/version':
-            print(f"{COLOR_CYAN}{t('version.title')}{COLOR_RESET}")
-            print(f"{COLOR_GREEN}{t('version.description')}{COLOR_RESET}")
-            print()
-            print(f"{COLOR_YELLOW}{t('version.version_info', version=VERSION)}{COLOR_RESET}")
-            print(f"{COLOR_BLUE}{t('version.repository')}{COLOR_RESET}")
-            return True
+        handler = self._cmd_table.get(command)
+        if handler is None:
+            # 兼容前缀匹配的命令（如 /language），先用元组一次判断是否可能命中
+            if not command.startswith(_CMD_PREFIXES):
+                print(f"{COLOR_RED}{t('commands.unknown_command', command=command)}{COLOR_RESET}")
+                return True
+            handler = next(h for prefix, h in self._cmd_prefix_table if command.startswith(prefix))
         
-        else:
-            print(f"{COLOR_RED}{t('commands.unknown_command', command=command)}{COLOR_RESET}")
-            return True
+        return handler(user_input, user_input.split())
     
     def show_welcome(self):
         """显示欢迎信息"""
         if self.current_config:
             ai_name = self.current_config.get('ai_name', 'AI')
-            config_name = self.config_manager.get_multilang_field(self.current_config, 'name')
-            welcome_message = self.config_manager.get_multilang_field(self.current_config, 'welcome_message')
-            print(f"{COLOR_GREEN}{t('app.ai_greeting', ai_name=ai_name)}{COLOR_RESET}")
-            print(f"{COLOR_GREEN}{t('app.current_config', name=config_name, id=self.current_config_id)}{COLOR_RESET}")
-            print(f"{COLOR_GREEN}{welcome_message}{COLOR_RESET}")
+            config_name = self.config_manager.get_config_field(self.current_config_id, 'name')
+            welcome_message = self.config_manager.get_config_field(self.current_config_id, 'welcome_message')
+            write_lines([
+                f"{COLOR_GREEN}{t('app.ai_greeting', ai_name=ai_name)}{COLOR_RESET}",
+                f"{COLOR_GREEN}{t('app.current_config', name=config_name, id=self.current_config_id)}{COLOR_RESET}",
+                f"{COLOR_GREEN}{welcome_message}{COLOR_RESET}",
+            ])
         else:
-            print(f"{COLOR_YELLOW}{t('app.welcome')}{COLOR_RESET}")
+            print(_ct(COLOR_YELLOW, 'app.welcome'))
+    
+    def _refresh_turn_settings(self) -> None:
+        """缓存每轮对话都会用到的配置项，配置加载或修改后调用"""
+        config = self.current_config
+        self._ai_name = config.get('ai_name', 'AI')
+        self._model = config.get('model', 'deepseek-chat')
+        self._use_stream = config.get('stream', True)
+        self._use_markdown = config.get('markdown', True)
+        self._auto_summary = config.get('summary', False)
+        self._max_tokens_cached = self._max_tokens(4000)
+    
+    def _session_system_message(self) -> Dict[str, str]:
+        """获取未启用历史记录时每轮使用的系统消息
+        
+        同一分钟内复用上次构建的消息，分钟变化或提示词变化时重新生成。
+        """
+        key = (self.current_config.get('system_Prompt', ''), int(time.time() // 60))
+        if self._system_message_key != key:
+            self._system_message_key = key
+            self._system_message = {"role": "system", "content": build_system_prompt(key[0])}
+        return self._system_message
+    
+    def _input_prompt(self) -> str:
+        """获取输入提示文本，只在AI名称或语言变化时重新生成"""
+        key = (self._ai_name, get_language())
+        if self._prompt_cache_key != key:
+            self._prompt_cache_key = key
+            self._prompt_text = f"\n{COLOR_YELLOW}{t('app.send_message_prompt', ai_name=key[0])}{COLOR_RESET}\n"
+        return self._prompt_text
     
     def process_message(self, user_input: str):
         """处理用户消息"""
         if not self.current_config or not self.client:
-            print(f"{COLOR_RED}{t('processing.load_config_first')}{COLOR_RESET}")
+            print(_ct(COLOR_RED, 'processing.load_config_first'))
+            return
+        
+        if not self.ensure_api_valid():
             return
         
         # 添加用户消息到历史记录
@@ -881,48 +1664,35 @@ class ChatTool:
             if self.history_manager:
                 messages = self.history_manager.get_messages_for_api()
             else:
-                system_prompt = self.current_config.get('system_Prompt', '')
-                enhanced_prompt = ensure_datetime_in_prompt(system_prompt)
-                processed_prompt = process_template(enhanced_prompt)
-                messages = [
-                    {"role": "system", "content": processed_prompt},
-                    {"role": "user", "content": user_input}
-                ]
+                # 系统消息对象在缓存有效期内直接复用
+                messages = [self._session_system_message(), {"role": "user", "content": user_input}]
             
-            # 检查是否启用流式响应
-            use_stream = self.current_config.get('stream', True)
-            ai_name = self.current_config.get('ai_name', 'AI')
+            ai_name = self._ai_name
             
-            if use_stream:
+            # 检查是否启用流式响应
+            if self._use_stream:
                 # 流式响应 - 不显示"正在处理"消息，让Live组件直接处理
                 ai_response = ""
                 response = self.client.chat.completions.create(
-                    model=self.current_config.get('model', 'deepseek-chat'),
+                    model=self._model,
                     messages=messages,
                     stream=True
                 )
                 
                 # 对于流式响应，根据配置决定是否使用Markdown渲染
-                use_markdown = self.current_config.get('markdown', True)
-                if use_markdown:
-                    ai_response = render_streaming_response(response, ai_name)
+                if self._use_markdown:
+                    ai_response = markdown_renderer.render_streaming_response(response, ai_name)
                 else:
                     # 不使用Markdown，直接输出文本
-                    ai_response = ""
                     print(f"\n{COLOR_BLUE}💬 {ai_name}{COLOR_RESET}")
-                    for chunk in response:
-                        if chunk.choices[0].delta.content:
-                            content = chunk.choices[0].delta.content
-                            print(content, end="", flush=True)
-                            ai_response += content
-                    print()  # 换行
+                    ai_response = stream_plain_text(response)
             else:
                 # 非流式响应 - 使用加载动画
                 start_loading(t('processing.processing_request'))
                 
                 try:
                     response = self.client.chat.completions.create(
-                        model=self.current_config.get('model', 'deepseek-chat'),
+                        model=self._model,
                         messages=messages,
                         stream=False
                     )
@@ -933,9 +1703,8 @@ class ChatTool:
                     stop_loading()
                 
                 # 根据配置决定是否使用Markdown渲染
-                use_markdown = self.current_config.get('markdown', True)
-                if use_markdown:
-                    render_ai_response(ai_response, ai_name)
+                if self._use_markdown:
+                    markdown_renderer.render_ai_response(ai_response, ai_name)
                 else:
                     # 不使用Markdown，直接输出文本
                     print(f"\n{COLOR_BLUE}💬 {ai_name}{COLOR_RESET}")
@@ -946,9 +1715,8 @@ class ChatTool:
                 self.history_manager.add_message('assistant', ai_response)
                 
                 # 检查是否需要总结
-                if self.summarizer and self.current_config.get('summary', False):
-                    max_tokens_raw = self.current_config.get('max_tokens', 4000)
-                    max_tokens = self._parse_token_value(str(max_tokens_raw), 4000)
+                if self.summarizer and self._auto_summary:
+                    max_tokens = self._max_tokens_cached
                     
                     if self.summarizer.should_summarize(self.history_manager.get_total_tokens(), max_tokens):
                         print(f"\n{COLOR_YELLOW}{t('summary.generating')}{COLOR_RESET}")
@@ -959,63 +1727,61 @@ class ChatTool:
                         )
                         
                         if summary_msg:
-                            self.history_manager.messages = new_messages
-                            self.history_manager.total_tokens = sum(msg.get('tokens', 0) for msg in new_messages)
-                            print(f"{COLOR_GREEN}{t('summary.completed')}{COLOR_RESET}")
+                            self.history_manager.replace_messages(new_messages, self.summarizer.last_token_total)
+                            print(_ct(COLOR_GREEN, 'summary.completed'))
                         else:
-                            print(f"{COLOR_YELLOW}{t('summary.failed')}{COLOR_RESET}")
+                            print(_ct(COLOR_YELLOW, 'summary.failed'))
                 
-                # 保存历史记录
-                self.history_manager.save_to_file()
+                # 保存历史记录（整体重写在后台线程进行，不阻塞下一次输入）
+                self.history_manager.save_in_background()
         
         except Exception as e:
+            self._handle_request_error(e, self.current_config.get('API_key'), self.current_config.get('API_endpoint'))
             print(f"\n{COLOR_RED}{t('processing.error', error=str(e))}{COLOR_RESET}")
     
     def run_simple_mode(self, args):
         """极简模式运行"""
         if not args.prompt:
             stop_loading()
-            print(f"{COLOR_RED}{t('simple_mode.prompt_required')}{COLOR_RESET}")
+            print(_ct(COLOR_RED, 'simple_mode.prompt_required'))
             return
         
-        # 使用临时配置，优先使用命令行参数，其次使用默认配置
-        api_key = args.key
-        api_endpoint = args.endpoint
-        model = args.model
+        # 使用临时配置，优先使用命令行参数，其次使用默认配置，最后使用内置默认值
+        cli_values = {key: value for key, value in zip(_SIMPLE_MODE_KEYS, (args.key, args.endpoint, args.model)) if value}
+        layers = [cli_values]
         
-        # 如果没有提供命令行参数，尝试从默认配置获取
-        if not api_key or not api_endpoint or not model:
-            default_config = None
-            if self.config_manager.default_config_id:
-                default_config = self.config_manager.get_config(self.config_manager.default_config_id)
-            
+        # 命令行参数不完整时才读取默认配置
+        if len(cli_values) < len(_SIMPLE_MODE_KEYS):
+            default_config = self.config_manager.get_config(self.config_manager.default_config_id)
             if default_config:
-                api_key = api_key or default_config.get('API_key')
-                api_endpoint = api_endpoint or default_config.get('API_endpoint')
-                model = model or default_config.get('model', 'deepseek-chat')
+                layers.append({key: default_config[key] for key in _SIMPLE_MODE_KEYS if default_config.get(key)})
         
-        # 设置默认值
-        api_key = api_key or "your_api_key_here"
-        api_endpoint = api_endpoint or "https://api.deepseek.com"
-        model = model or "deepseek-chat"
+        layers.append(_SIMPLE_MODE_DEFAULTS)
+        resolved = ChainMap(*layers)
+        api_key = resolved['API_key']
+        api_endpoint = resolved['API_endpoint']
+        model = resolved['model']
         
         if api_key == "your_api_key_here":
             stop_loading()
-            print(f"{COLOR_RED}{t('simple_mode.api_key_required')}{COLOR_RESET}")
+            print(_ct(COLOR_RED, 'simple_mode.api_key_required'))
             return
         
-        if not self.validate_api(api_key, api_endpoint):
-            stop_loading()
-            return
+        # 默认不预先验证：密钥无效时请求本身会返回认证错误，省去一次网络往返
+        client = None
+        if args.validate:
+            client = self._build_and_validate_client(api_key, api_endpoint, force=True)
+            if client is None:
+                stop_loading()
+                return
         
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key, base_url=api_endpoint)
+            # 未验证时在此创建客户端，端点格式错误等异常按请求错误统一提示
+            if client is None:
+                client = self._get_client(api_key, api_endpoint)
             
             # 为极简模式添加基本的系统提示词和时间信息
-            system_prompt = t('simple_mode.default_system_prompt')
-            enhanced_prompt = ensure_datetime_in_prompt(system_prompt)
-            processed_prompt = process_template(enhanced_prompt)
+            processed_prompt = build_system_prompt(t('simple_mode.default_system_prompt'))
             stop_loading()
             
             # 根据参数决定是否使用流式响应
@@ -1043,30 +1809,27 @@ class ChatTool:
                 else:
                     # 使用Markdown格式化但非流式
                     stop_loading()
-                    from markdown_renderer import render_markdown
-                    render_markdown(response.choices[0].message.content)
+                    markdown_renderer.render_ai_response(response.choices[0].message.content, t('simple_mode.ai_reply'))
             else:
                 # 流式响应
                 if args.nomd:
                     # 流式输出但不使用Markdown格式化
-                    for chunk in response:
-                        if chunk.choices[0].delta.content is not None:
-                            print(chunk.choices[0].delta.content, end='', flush=True)
-                    print()  # 换行
+                    stream_plain_text(response)
                 else:
                     # 流式Markdown渲染
-                    render_streaming_response(response, t('simple_mode.ai_reply'))
+                    markdown_renderer.render_streaming_response(response, t('simple_mode.ai_reply'))
             
         except Exception as e:
             stop_loading()
+            self._handle_request_error(e, api_key, api_endpoint)
             print(f"{COLOR_RED}{t('simple_mode.processing_error', error=str(e))}{COLOR_RESET}")
     
     def run_interactive_mode(self, config_id: str = None):
         """交互模式运行"""
         # 加载配置
         if config_id:
-            if not self.load_config(config_id):
-                print(f"{COLOR_YELLOW}{t('startup.using_default_config')}{COLOR_RESET}")
+            if not self.bind_config(config_id):
+                print(_ct(COLOR_YELLOW, 'startup.using_default_config'))
                 config_id = self.config_manager.default_config_id
         else:
             config_id = self.config_manager.default_config_id
@@ -1075,7 +1838,7 @@ class ChatTool:
         if not self.current_config:
             if not self.config_manager.configs:
                 stop_loading()
-                print(f"{COLOR_YELLOW}{t('startup.first_time_setup')}{COLOR_RESET}")
+                print(_ct(COLOR_YELLOW, 'startup.first_time_setup'))
                 
                 # 首次使用时先选择语言
                 self.select_initial_language()
@@ -1084,14 +1847,14 @@ class ChatTool:
                 if config_data:
                     self.config_manager.add_config(config_id, config_data)
                     self.config_manager.set_default_config(config_id)
-                    self.load_config(config_id)
+                    self.bind_config(config_id)
                 else:
-                    print(f"{COLOR_RED}{t('startup.config_creation_failed')}{COLOR_RESET}")
+                    print(_ct(COLOR_RED, 'startup.config_creation_failed'))
                     return
             else:
-                if not self.load_config(config_id):
+                if not self.bind_config(config_id):
                     stop_loading()
-                    print(f"{COLOR_RED}{t('startup.cannot_load_config')}{COLOR_RESET}")
+                    print(_ct(COLOR_RED, 'startup.cannot_load_config'))
                     return
         
         # 清屏并显示欢迎信息
@@ -1102,14 +1865,11 @@ class ChatTool:
         # 主循环
         while True:
             try:
-                ai_name = self.current_config.get('ai_name', 'AI')
-                prompt_text = f"\n{COLOR_YELLOW}{t('app.send_message_prompt', ai_name=ai_name)}{COLOR_RESET}\n"
-                
                 # 使用多行输入函数
-                user_input = get_multiline_input(prompt_text)
+                user_input = get_multiline_input(self._input_prompt())
                 
                 if not user_input.strip():
-                    print(f"{COLOR_RED}{t('app.input_cannot_be_empty')}{COLOR_RESET}")
+                    print(_ct(COLOR_RED, 'app.input_cannot_be_empty'))
                     continue
                 
                 # 处理命令
@@ -1147,6 +1907,7 @@ def parse_arguments():
     parser.add_argument('--prompt', '-p', type=str, help=t('args.prompt_help'))
     parser.add_argument('--nomd', '-n', action='store_true', help=t('args.nomd_help'))
     parser.add_argument('--unstream', '-u', action='store_true', help=t('args.unstream_help'))
+    parser.add_argument('--validate', action='store_true', help=t('args.validate_help'))
     
     return parser.parse_args()
 
@@ -1165,28 +1926,32 @@ def main():
             stop_loading()
             raise e
         
-        tool = ChatTool()
+        config_manager = ConfigManager()
         
-        # 尝试从配置文件中获取语言设置（复用ChatTool中的config_manager）
-        if tool.config_manager.configs:
+        # 尝试从配置文件中获取语言设置
+        if config_manager.configs:
             # 获取默认配置的语言设置
-            default_config = tool.config_manager.get_config(tool.config_manager.default_config_id)
+            default_config = config_manager.get_config(config_manager.default_config_id)
             if default_config and 'language' in default_config:
                 set_language(default_config['language'])
         
-        # 列出配置
+        # 列出配置（只需要配置管理器，不构建ChatTool）
         if args.list:
-            configs = tool.config_manager.list_configs()
+            configs = config_manager.list_configs()
             stop_loading()
             if not configs:
-                print(f"{COLOR_YELLOW}{t('config.no_configs_available')}{COLOR_RESET}")
+                print(_ct(COLOR_YELLOW, 'config.no_configs_available'))
             else:
-                print(f"{COLOR_YELLOW}{t('config.available_configs')}{COLOR_RESET}")
+                alias_label = t('config.alias_label')
+                lines = [_ct(COLOR_YELLOW, 'config.available_configs')]
                 for config_id, name, aliases in configs:
-                    alias_str = f" ({t('config.alias_label')}: {', '.join(aliases)})" if aliases else ""
-                    print(f"{COLOR_BLUE}- {config_id}: {name}{alias_str}{COLOR_RESET}")
+                    alias_str = f" ({alias_label}: {', '.join(aliases)})" if aliases else ""
+                    lines.append(f"{COLOR_BLUE}- {config_id}: {name}{alias_str}{COLOR_RESET}")
+                write_lines(lines)
             return
         
+        tool = ChatTool(config_manager)
+        
         # 极简模式
         if args.simple:
             tool.run_simple_mode(args)
@@ -4,18 +4,27 @@
 """
 
 import os
+import re
+import sys
+import time
 import signal
 import platform
-from rich.console import Console
+from rich.console import Console, Group
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.text import Text
 from rich.live import Live
-from typing import Optional, Iterator, Any, Dict, List, Tuple
+from typing import Optional, Iterator, Any, Deque, Dict, List, Tuple
+from collections import deque
+from itertools import islice
 from dataclasses import dataclass
-from threading import Lock
+from functools import lru_cache
+from threading import Event, Lock, Thread
 
-@dataclass
+# Python 3.10+ 支持slots数据类，去掉实例__dict__；带默认值的字段无法手写__slots__，旧版本保持普通数据类
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class RenderedContent:
     """渲染内容的缓存结构"""
     content: str
@@ -23,16 +32,117 @@ class RenderedContent:
     border_style: str
     content_type: str  # 'ai_response', 'user_message', 'system_message', 'error_message'
     is_markdown: bool = True
+    cached_renderable: Optional[Any] = None  # 已解析的渲染对象，重绘时直接复用
+
+# 会让Markdown渲染结果与纯文本不同的内容：语法字符、实体（&）、回车、行首缩进和行尾空白、行首的有序列表编号、
+# 段内换行（Markdown会合并为空格）、多余的空行以及首尾换行（Markdown会折叠或去掉）
+_MD_META = re.compile(
+    r'[#*_`\[\]>|~\\<=+&\r-]'
+    r'|^[ \t]|[ \t]$'
+    r'|^\d+[.)](?:\s|$)'
+    r'|(?<!\n)\n(?!\n)|\n{3,}|\A\n|\n\Z',
+    re.MULTILINE
+)
+
+def _to_renderable(text: str) -> Any:
+    """只由单行段落（以空行分隔）组成的纯文本直接作为Text渲染，跳过Markdown解析
+    
+    此时Text与Markdown的输出完全一致；其余文本一律交给Markdown。
+    """
+    if text and _MD_META.search(text) is None:
+        return Text(text)
+    return Markdown(text)
+
+@lru_cache(maxsize=512)
+def _parse_block(text: str) -> Any:
+    """解析单个已完成的Markdown块，相同内容的块（如重复的样板段落）只解析一次"""
+    return _to_renderable(text)
+
+# 所有渲染器共用同一个Console，终端检测只做一次
+_console = Console()
+
+# 流式渲染的最小更新间隔（秒）；内容越长解析越慢，间隔按每秒可处理的字符数放宽
+STREAM_UPDATE_MIN_INTERVAL = 0.1
+STREAM_UPDATE_CHARS_PER_SECOND = 50_000
+# 两次更新之间至少到达一个自然边界（换行、句末标点）或累积到一定字符数，减少终端重绘
+STREAM_UPDATE_BATCH_CHARS = 200
+_SENTENCE_ENDS = ('.', '!', '?', ':', '。', '！', '？', '：', '；')
+
+class _BlockSplitter:
+    """流式Markdown块切分器
+    
+    在代码块外的空行处切分出已完成的块，已完成的块只需解析一次，
+    每次更新只重新解析尚未完成的尾部文本。
+    """
+    
+    def __init__(self):
+        self.pending = ""       # 尚未完成的块文本
+        self._scan_pos = 0      # pending中下一个未扫描行的起点
+        self._fence = ""        # 当前代码块的起始围栏（如```或~~~~），为空表示不在代码块内
+    
+    def _update_fence(self, stripped: str) -> None:
+        """根据围栏行更新代码块状态
+        
+        关闭围栏须使用与起始围栏相同的字符、长度不短于起始围栏且后面没有其他文字，
+        因此代码块内较短的围栏或另一种围栏不会提前结束代码块。
+        """
+        marker = stripped[0]
+        run = len(stripped) - len(stripped.lstrip(marker))
+        if not self._fence:
+            self._fence = marker * run
+        elif marker == self._fence[0] and run >= len(self._fence) and not stripped[run:].strip():
+            self._fence = ""
+    
+    def feed(self, content: str) -> List[str]:
+        """追加文本并返回新完成的块
+        
+        Args:
+            content: 新到达的文本
+            
+        Returns:
+            新完成的块列表
+        """
+        text = self.pending + content
+        blocks = []
+        start = 0
+        pos = self._scan_pos
+        
+        # 只扫描新出现的完整行
+        while True:
+            end = text.find('\n', pos)
+            if end == -1:
+                break
+            stripped = text[pos:end].strip()
+            if stripped.startswith(('```', '~~~')):
+                self._update_fence(stripped)
+            elif not stripped and not self._fence:
+                if text[start:pos].strip():
+                    blocks.append(text[start:pos])
+                start = end + 1
+            pos = end + 1
+        
+        self.pending = text[start:]
+        self._scan_pos = pos - start
+        return blocks
 
 class MarkdownRenderer:
     """Markdown渲染器"""
     
+    # 内容类型 -> (标题图标, 边框颜色)
+    _TYPE_META: Dict[str, Tuple[str, str]] = {
+        'ai_response': ("💬", "blue"),
+        'user_message': ("👤", "green"),
+        'system_message': ("⚙️", "yellow"),
+        'error_message': ("❌", "red"),
+    }
+    
     def __init__(self):
-        self.console = Console()
-        self.rendered_history: List[RenderedContent] = []  # 渲染历史缓存
+        self.console = _console
         self.max_history = 50  # 最大缓存数量
+        self.rendered_history: Deque[RenderedContent] = deque(maxlen=self.max_history)  # 渲染历史缓存，超出上限自动淘汰最旧的
         self._lock = Lock()  # 线程锁
         self._signal_handler_installed = False
+        self._resize_event = Event()  # 信号处理器只置位，由后台线程完成重绘
         
         # 只在Unix系统上安装信号处理器
         if platform.system() != 'Windows':
@@ -44,12 +154,28 @@ class MarkdownRenderer:
             if hasattr(signal, 'SIGWINCH') and not self._signal_handler_installed:
                 signal.signal(signal.SIGWINCH, self._handle_resize)
                 self._signal_handler_installed = True
+                Thread(target=self._resize_worker, daemon=True).start()
         except (AttributeError, OSError) as e:
             # 如果信号不可用或安装失败，静默忽略
             pass
     
     def _handle_resize(self, signum, frame) -> None:
-        """处理窗口大小变化信号"""
+        """处理窗口大小变化信号
+        
+        信号处理器中不加锁也不做终端输出，只通知后台线程重绘，
+        避免在持有锁的代码中途被打断时死锁。
+        """
+        self._resize_event.set()
+    
+    def _resize_worker(self) -> None:
+        """后台重绘线程，连续多次窗口变化合并为一次重绘"""
+        while True:
+            self._resize_event.wait()
+            self._resize_event.clear()
+            self._redraw_after_resize()
+    
+    def _redraw_after_resize(self) -> None:
+        """窗口大小变化后重新渲染最近的内容"""
         try:
             with self._lock:
                 if self.rendered_history:
@@ -58,55 +184,66 @@ class MarkdownRenderer:
                     
                     # 重新渲染最近的内容
                     recent_count = min(10, len(self.rendered_history))  # 只重新渲染最近10条
-                    for rendered_content in self.rendered_history[-recent_count:]:
+                    start = len(self.rendered_history) - recent_count
+                    for rendered_content in islice(self.rendered_history, start, None):
                         self._render_cached_content(rendered_content)
         except Exception:
-            # 信号处理中不应该抛出异常
+            # 后台重绘失败时静默忽略
             pass
     
     def _render_cached_content(self, rendered_content: RenderedContent) -> None:
         """重新渲染缓存的内容"""
         try:
-            title = Text(rendered_content.title, style=f"bold {rendered_content.border_style}")
-            
-            if rendered_content.is_markdown and rendered_content.content_type == 'ai_response':
+            if rendered_content.cached_renderable is not None:
+                content = rendered_content.cached_renderable
+            elif rendered_content.is_markdown and rendered_content.content_type == 'ai_response':
                 try:
-                    markdown = Markdown(rendered_content.content)
+                    markdown = _to_renderable(rendered_content.content)
                     content = markdown
                 except Exception:
                     content = rendered_content.content
             else:
                 content = rendered_content.content
             
-            panel = Panel(
-                content,
-                title=title,
-                title_align="left",
-                border_style=rendered_content.border_style,
-                padding=(0, 1)
-            )
-            
-            self.console.print(panel)
+            self.console.print(self._make_panel(content, rendered_content.title, rendered_content.border_style))
         except Exception:
             # 渲染失败时静默忽略
             pass
     
-    def _add_to_history(self, content: str, title: str, border_style: str, content_type: str, is_markdown: bool = True) -> None:
+    def _add_to_history(self, content: str, title: str, border_style: str, content_type: str, is_markdown: bool = True,
+                        renderable: Optional[Any] = None) -> None:
         """添加内容到渲染历史"""
         with self._lock:
+            # 与最近一条完全相同（类型和内容一致）时不重复记录
+            if self.rendered_history:
+                last = self.rendered_history[-1]
+                if last.content_type == content_type and last.content == content:
+                    return
+            
             rendered_content = RenderedContent(
                 content=content,
                 title=title,
                 border_style=border_style,
                 content_type=content_type,
-                is_markdown=is_markdown
+                is_markdown=is_markdown,
+                cached_renderable=renderable
             )
             
             self.rendered_history.append(rendered_content)
-            
-            # 限制历史记录数量
-            if len(self.rendered_history) > self.max_history:
-                self.rendered_history = self.rendered_history[-self.max_history:]
+    
+    @staticmethod
+    def _panel_kwargs(title_text: str, border_style: str) -> Dict[str, Any]:
+        """构造Panel的公共参数（标题、对齐、边框颜色、内边距）"""
+        return dict(
+            title=Text(title_text, style=f"bold {border_style}"),
+            title_align="left",
+            border_style=border_style,
+            padding=(0, 1)
+        )
+    
+    def _make_panel(self, body: Any, title_text: str, border_style: str) -> Panel:
+        """用统一的标题样式包装内容"""
+        return Panel(body, **self._panel_kwargs(title_text, border_style))
     
     def render_ai_response(self, content: str, ai_name: str = "AI") -> None:
         """渲染AI回复，支持Markdown格式
@@ -119,25 +256,13 @@ class MarkdownRenderer:
         
         try:
             # 创建Markdown对象
-            markdown = Markdown(content)
-            
-            # 创建标题
-            title = Text(title_text, style="bold blue")
+            markdown = _to_renderable(content)
             
-            # 使用Panel包装，提供更好的视觉效果
-            panel = Panel(
-                markdown,
-                title=title,
-                title_align="left",
-                border_style="blue",
-                padding=(0, 1)
-            )
-            
-            # 渲染到终端
-            self.console.print(panel)
+            # 使用Panel包装后渲染到终端
+            self.console.print(self._make_panel(markdown, title_text, "blue"))
             
             # 添加到渲染历史
-            self._add_to_history(content, title_text, "blue", "ai_response", True)
+            self._add_to_history(content, title_text, "blue", "ai_response", True, markdown)
             
         except Exception as e:
             # 如果Markdown渲染失败，回退到普通文本
@@ -153,57 +278,96 @@ class MarkdownRenderer:
         Returns:
             完整的AI回复内容
         """
-        accumulated_content = ""
+        parts: List[str] = []
         title_text = f"💬 {ai_name}"
-        title = Text(title_text, style="bold blue")
+        # 标题等Panel参数只构造一次，每次更新复用
+        panel_kwargs = self._panel_kwargs(title_text, "blue")
         
         # 初始化空的Panel
-        initial_panel = Panel(
-            "",
-            title=title,
-            title_align="left",
-            border_style="blue",
-            padding=(0, 1)
-        )
+        initial_panel = Panel("", **panel_kwargs)
+        
+        # 已完成的块解析一次后缓存，每次更新只解析尾部
+        splitter = _BlockSplitter()
+        committed: List[Any] = []
+        total_len = 0
+        last_update = 0.0
+        since_update = 0  # 上次更新后新增的字符数
+        final_markdown = None
         
         try:
             with Live(initial_panel, refresh_per_second=4, console=self.console) as live:
                 for chunk in stream:
-                    if hasattr(chunk, 'choices') and chunk.choices and chunk.choices[0].delta.content is not None:
-                        content = chunk.choices[0].delta.content
-                        accumulated_content += content
+                    choices = getattr(chunk, 'choices', None)
+                    if not choices:
+                        continue
+                    content = choices[0].delta.content
+                    if content is not None:
+                        parts.append(content)
+                        total_len += len(content)
+                        since_update += len(content)
                         
                         # 尝试渲染Markdown，失败时显示纯文本
                         try:
-                            markdown = Markdown(accumulated_content)
-                            panel = Panel(
-                                markdown,
-                                title=title,
-                                title_align="left",
-                                border_style="blue",
-                                padding=(0, 1)
-                            )
-                            live.update(panel)
+                            blocks = splitter.feed(content)
+                            for block in blocks:
+                                if committed:
+                                    committed.append("")  # 块之间保留空行
+                                committed.append(_parse_block(block))
+                            
+                            # 自适应节流：没有新完成的块时，需同时满足更新间隔和自然边界才刷新
+                            if not blocks:
+                                now = time.monotonic()
+                                interval = max(STREAM_UPDATE_MIN_INTERVAL, total_len / STREAM_UPDATE_CHARS_PER_SECOND)
+                                if now - last_update < interval:
+                                    continue
+                                at_boundary = ('\n' in content or content.rstrip().endswith(_SENTENCE_ENDS)
+                                               or since_update >= STREAM_UPDATE_BATCH_CHARS)
+                                if not at_boundary:
+                                    continue
+                            last_update = time.monotonic()
+                            since_update = 0
+                            
+                            body = Group(*committed, _to_renderable(splitter.pending))
+                            live.update(Panel(body, **panel_kwargs))
                         except Exception:
                             # Markdown解析失败时显示纯文本
-                            panel = Panel(
-                                accumulated_content,
-                                title=title,
-                                title_align="left",
-                                border_style="blue",
-                                padding=(0, 1)
-                            )
-                            live.update(panel)
+                            live.update(Panel("".join(parts), **panel_kwargs))
+                
+                # 结束时完整解析一次：补上被节流跳过的内容，并修正分块渲染与整体渲染的差异（如跨空行的列表）
+                if parts:
+                    try:
+                        final_markdown = _to_renderable("".join(parts))
+                        live.update(Panel(final_markdown, **panel_kwargs))
+                    except Exception:
+                        pass
         except Exception as e:
             # 如果Live渲染失败，回退到普通显示
-            self.render_plain_text(accumulated_content, ai_name)
+            self.render_plain_text("".join(parts), ai_name)
+        
+        accumulated_content = "".join(parts)
         
         # 添加到渲染历史
         if accumulated_content:
-            self._add_to_history(accumulated_content, title_text, "blue", "ai_response", True)
+            self._add_to_history(accumulated_content, title_text, "blue", "ai_response", True, final_markdown)
         
         return accumulated_content
     
+    def _render_titled(self, content: str, name: str, kind: str) -> None:
+        """以带标题的Panel渲染纯文本消息并加入渲染历史
+        
+        Args:
+            content: 消息内容
+            name: 标题中显示的名称
+            kind: 内容类型，对应_TYPE_META中的键
+        """
+        emoji, border_style = self._TYPE_META[kind]
+        title_text = f"{emoji} {name}"
+        
+        self.console.print(self._make_panel(content, title_text, border_style))
+        
+        # 添加到渲染历史
+        self._add_to_history(content, title_text, border_style, kind, False)
+    
     def render_plain_text(self, content: str, ai_name: str = "AI") -> None:
         """渲染普通文本（回退方案）
         
@@ -211,21 +375,7 @@ class MarkdownRenderer:
             content: 文本内容
             ai_name: AI名称
         """
-        title_text = f"💬 {ai_name}"
-        title = Text(title_text, style="bold blue")
-        
-        panel = Panel(
-            content,
-            title=title,
-            title_align="left",
-            border_style="blue",
-            padding=(0, 1)
-        )
-        
-        self.console.print(panel)
-        
-        # 添加到渲染历史
-        self._add_to_history(content, title_text, "blue", "ai_response", False)
+        self._render_titled(content, ai_name, "ai_response")
     
     def render_user_message(self, content: str, user_name: str = "You") -> None:
         """渲染用户消息
@@ -234,21 +384,7 @@ class MarkdownRenderer:
             content: 用户消息内容
             user_name: 用户名称
         """
-        title_text = f"👤 {user_name}"
-        title = Text(title_text, style="bold green")
-        
-        panel = Panel(
-            content,
-            title=title,
-            title_align="left",
-            border_style="green",
-            padding=(0, 1)
-        )
-        
-        self.console.print(panel)
-        
-        # 添加到渲染历史
-        self._add_to_history(content, title_text, "green", "user_message", False)
+        self._render_titled(content, user_name, "user_message")
     
     def render_system_message(self, content: str, message_type: str = "System") -> None:
         """渲染系统消息
@@ -257,21 +393,7 @@ class MarkdownRenderer:
             content: 系统消息内容
             message_type: 消息类型
         """
-        title_text = f"⚙️ {message_type}"
-        title = Text(title_text, style="bold yellow")
-        
-        panel = Panel(
-            content,
-            title=title,
-            title_align="left",
-            border_style="yellow",
-            padding=(0, 1)
-        )
-        
-        self.console.print(panel)
-        
-        # 添加到渲染历史
-        self._add_to_history(content, title_text, "yellow", "system_message", False)
+        self._render_titled(content, message_type, "system_message")
     
     def render_error_message(self, content: str) -> None:
         """渲染错误消息
@@ -279,21 +401,7 @@ class MarkdownRenderer:
         Args:
             content: 错误消息内容
         """
-        title_text = "❌ Error"
-        title = Text(title_text, style="bold red")
-        
-        panel = Panel(
-            content,
-            title=title,
-            title_align="left",
-            border_style="red",
-            padding=(0, 1)
-        )
-        
-        self.console.print(panel)
-        
-        # 添加到渲染历史
-        self._add_to_history(content, title_text, "red", "error_message", False)
+        self._render_titled(content, "Error", "error_message")
     
     def print_separator(self) -> None:
         """打印分隔线"""
@@ -317,7 +425,8 @@ class MarkdownRenderer:
                     
                     # 重新渲染最近的内容
                     recent_count = min(count, len(self.rendered_history))
-                    for rendered_content in self.rendered_history[-recent_count:]:
+                    start = len(self.rendered_history) - recent_count
+                    for rendered_content in islice(self.rendered_history, start, None):
                         self._render_cached_content(rendered_content)
                 else:
                     # 如果没有历史记录，只清屏
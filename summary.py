@@ -14,7 +14,8 @@ from i18n import t
 class ChatSummarizer:
     """聊天总结器类"""
     
-    def __init__(self, api_key: str, api_endpoint: str, model: str = "deepseek-chat"):
+    def __init__(self, api_key: str, api_endpoint: str, model: str = "deepseek-chat",
+                 client: Optional[OpenAI] = None):
         """
         初始化聊天总结器
         
@@ -22,10 +23,25 @@ class ChatSummarizer:
             api_key: OpenAI API密钥
             api_endpoint: API端点
             model: 使用的模型
+            client: 可复用的OpenAI客户端，为None时新建
         """
-        self.client = OpenAI(api_key=api_key, base_url=api_endpoint)
+        self.client = client if client is not None else OpenAI(api_key=api_key, base_url=api_endpoint)
         self.model = model
         self.summary_prompt = t('summary.prompt_template')
+        # 模板中只有{conversation_history}一个占位符时预先切分，调用时直接拼接
+        marker = "{conversation_history}"
+        if self.summary_prompt.count("{") == 1 and marker in self.summary_prompt:
+            self._prompt_parts: Optional[Tuple[str, str]] = tuple(self.summary_prompt.split(marker, 1))
+        else:
+            self._prompt_parts = None
+        self.context_prefix = t('summary.context_prefix')
+        # 角色显示名称在初始化时查好，格式化消息时直接查表
+        self._role_names = {
+            "system": t('summary.role_system'),
+            "user": t('summary.role_user'),
+            "assistant": t('summary.role_assistant'),
+        }
+        self.last_token_total: Optional[int] = None  # 最近一次总结后新消息列表的Token总数
     
     def _parse_token_value(self, token_input: str, default_value: int) -> int:
         """解析Token值，支持K/k单位"""
@@ -44,6 +60,13 @@ class ChatSummarizer:
         except ValueError:
             return default_value
     
+    def _build_summary_prompt(self, conversation_text: str) -> str:
+        """将对话文本填入总结提示词模板"""
+        if self._prompt_parts is not None:
+            prefix, suffix = self._prompt_parts
+            return f"{prefix}{conversation_text}{suffix}"
+        return self.summary_prompt.format(conversation_history=conversation_text)
+    
     def _format_messages_for_summary(self, messages: List[Dict[str, Any]]) -> str:
         """
         将消息格式化为适合总结的文本
@@ -54,7 +77,7 @@ class ChatSummarizer:
         Returns:
             格式化后的对话文本
         """
-        formatted_text = ""
+        parts: List[str] = []
         
         for msg in messages:
             role = msg.get("role", "unknown")
@@ -66,22 +89,15 @@ class ChatSummarizer:
                 continue
             
             # 格式化角色名称
-            if role == "system":
-                role_name = t('summary.role_system')
-            elif role == "user":
-                role_name = t('summary.role_user')
-            elif role == "assistant":
-                role_name = t('summary.role_assistant')
-            else:
-                role_name = role
+            role_name = self._role_names.get(role, role)
             
             # 添加到格式化文本
             if timestamp:
-                formatted_text += f"[{timestamp[:19]}] {role_name}: {content}\n\n"
+                parts.append(f"[{timestamp[:19]}] {role_name}: {content}\n\n")
             else:
-                formatted_text += f"{role_name}: {content}\n\n"
+                parts.append(f"{role_name}: {content}\n\n")
         
-        return formatted_text.strip()
+        return "".join(parts).strip()
     
     def _create_summary_message(self, summary_content: str, 
                               summarized_messages: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -108,7 +124,7 @@ class ChatSummarizer:
             "id": f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
             "type": "summary",
             "role": "system",
-            "content": f"{t('summary.context_prefix')}{summary_content}",
+            "content": f"{self.context_prefix}{summary_content}",
             "timestamp": datetime.now().isoformat(),
             "tokens": summary_tokens,
             "summary_metadata": {
@@ -179,12 +195,19 @@ class ChatSummarizer:
         Returns:
             (总结消息, 保留的消息列表)
         """
+        self.last_token_total = None
+        
         if len(messages) <= keep_recent + 1:  # +1 for system message
             return None, messages
         
-        # 分离system消息和其他消息
-        system_messages = [msg for msg in messages if msg.get("role") == "system" and msg.get("type") != "summary"]
-        non_system_messages = [msg for msg in messages if msg.get("role") != "system" or msg.get("type") == "summary"]
+        # 单次遍历分离system消息和其他消息（总结消息归入其他消息）
+        system_messages: List[Dict[str, Any]] = []
+        non_system_messages: List[Dict[str, Any]] = []
+        for msg in messages:
+            if msg.get("role") == "system" and msg.get("type") != "summary":
+                system_messages.append(msg)
+            else:
+                non_system_messages.append(msg)
         
         if len(non_system_messages) <= keep_recent:
             return None, messages
@@ -218,7 +241,7 @@ class ChatSummarizer:
                 messages=[
                     {
                         "role": "user",
-                        "content": self.summary_prompt.format(conversation_history=conversation_text)
+                        "content": self._build_summary_prompt(conversation_text)
                     }
                 ],
                 temperature=0.3,  # 较低的温度以获得更一致的总结
@@ -239,6 +262,13 @@ class ChatSummarizer:
             # 构建新的消息列表：system消息 + 总结消息 + 保留的消息
             new_messages = system_messages + [summary_message] + messages_to_keep
             
+            # 记录新消息列表的Token总数，调用方无需再次遍历求和
+            self.last_token_total = (
+                sum(msg.get("tokens", 0) for msg in system_messages)
+                + summary_message["tokens"]
+                + sum(msg.get("tokens", 0) for msg in messages_to_keep)
+            )
+            
             return summary_message, new_messages
             
         except Exception as e:
@@ -272,27 +302,30 @@ class ChatSummarizer:
         Returns:
             总结统计信息
         """
-        summary_messages = [msg for msg in messages if msg.get("type") == "summary"]
-        original_messages = [msg for msg in messages if msg.get("type") != "summary"]
+        # 单次遍历累计所有统计量
+        total_summaries = 0
+        original_count = 0
+        total_original_tokens = 0
+        total_summary_tokens = 0
+        total_original_from_summaries = 0
         
-        total_summaries = len(summary_messages)
-        total_original_tokens = sum(msg.get("tokens", 0) for msg in original_messages)
-        total_summary_tokens = sum(msg.get("tokens", 0) for msg in summary_messages)
+        for msg in messages:
+            tokens = msg.get("tokens", 0)
+            if msg.get("type") == "summary":
+                total_summaries += 1
+                total_summary_tokens += tokens
+                total_original_from_summaries += msg.get("summary_metadata", {}).get("original_tokens", 0)
+            else:
+                original_count += 1
+                total_original_tokens += tokens
         
         # 计算压缩比
-        if total_summaries > 0:
-            total_original_from_summaries = sum(
-                msg.get("summary_metadata", {}).get("original_tokens", 0) 
-                for msg in summary_messages
-            )
-            compression_ratio = (total_summary_tokens / total_original_from_summaries 
-                               if total_original_from_summaries > 0 else 0)
-        else:
-            compression_ratio = 0
+        compression_ratio = (total_summary_tokens / total_original_from_summaries
+                             if total_original_from_summaries > 0 else 0)
         
         return {
             "total_summaries": total_summaries,
-            "original_message_count": len(original_messages),
+            "original_message_count": original_count,
             "total_original_tokens": total_original_tokens,
             "total_summary_tokens": total_summary_tokens,
             "compression_ratio": round(compression_ratio, 3),
@@ -309,19 +342,17 @@ class ChatSummarizer:
         Returns:
             总结内容列表
         """
-        summaries = []
-        for msg in messages:
-            if msg.get("type") == "summary" and msg.get("role") == "system":
-                content = msg.get("content", "")
-                # 移除总结前缀
-                prefix = t('summary.context_prefix')
-                if content.startswith(prefix):
-                    content = content[len(prefix):].strip()
-                summaries.append(content)
-        return summaries
+        # 移除总结前缀
+        prefix = self.context_prefix
+        return [
+            msg.get("content", "").removeprefix(prefix).strip()
+            for msg in messages
+            if msg.get("type") == "summary" and msg.get("role") == "system"
+        ]
 
 
-def create_summarizer(api_key: str, api_endpoint: str, model: str = "deepseek-chat") -> ChatSummarizer:
+def create_summarizer(api_key: str, api_endpoint: str, model: str = "deepseek-chat",
+                      client: Optional[OpenAI] = None) -> ChatSummarizer:
     """
     创建聊天总结器的工厂函数
     
@@ -329,11 +360,12 @@ def create_summarizer(api_key: str, api_endpoint: str, model: str = "deepseek-ch
         api_key: API密钥
         api_endpoint: API端点
         model: 使用的模型
+        client: 可复用的OpenAI客户端，为None时新建
         
     Returns:
         ChatSummarizer实例
     """
-    return ChatSummarizer(api_key, api_endpoint, model)
+    return ChatSummarizer(api_key, api_endpoint, model, client)
 
 
 if __name__ == "__main__":
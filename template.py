@@ -6,16 +6,43 @@
 """
 
 import re
-import time
 from datetime import datetime
-from typing import Dict, Callable
+from functools import lru_cache
+from typing import Dict, Callable, Tuple
+
+# 模板变量匹配正则表达式
+_VARIABLE_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+@lru_cache(maxsize=128)
+def _split_template(text: str) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]:
+    """将模板预先切分为字面量片段和变量，同一模板只做一次正则扫描
+    
+    Args:
+        text: 包含模板变量的文本
+        
+    Returns:
+        (字面量片段, 变量列表)，字面量片段比变量多一个；
+        每个变量为 (小写变量名, 原始模板文本)
+    """
+    literals = []
+    variables = []
+    pos = 0
+    for match in _VARIABLE_PATTERN.finditer(text):
+        literals.append(text[pos:match.start()])
+        variables.append((match.group(1).lower(), match.group(0)))
+        pos = match.end()
+    literals.append(text[pos:])
+    return tuple(literals), tuple(variables)
 
 class TemplateProcessor:
     """模板变量处理器"""
     
+    WEEKDAYS = ('星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日')
+    
     def __init__(self):
         """初始化模板处理器"""
-        self.variables: Dict[str, Callable[[], str]] = {
+        # 变量函数接收本次处理时取得的当前时间，保证同一模板内各变量一致
+        self.variables: Dict[str, Callable[[datetime], str]] = {
             'time': self._get_time,
             'date': self._get_date,
             'datetime': self._get_datetime,
@@ -27,40 +54,39 @@ class TemplateProcessor:
         }
         
         # 模板变量匹配正则表达式
-        self.pattern = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+        self.pattern = _VARIABLE_PATTERN
     
-    def _get_time(self) -> str:
+    def _get_time(self, now: datetime) -> str:
         """获取当前时间 (HH:MM:SS)"""
-        return datetime.now().strftime('%H:%M:%S')
+        return now.strftime('%H:%M:%S')
     
-    def _get_date(self) -> str:
+    def _get_date(self, now: datetime) -> str:
         """获取当前日期 (YYYY-MM-DD)"""
-        return datetime.now().strftime('%Y-%m-%d')
+        return now.strftime('%Y-%m-%d')
     
-    def _get_datetime(self) -> str:
+    def _get_datetime(self, now: datetime) -> str:
         """获取当前日期时间 (YYYY-MM-DD HH:MM:SS)"""
-        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return now.strftime('%Y-%m-%d %H:%M:%S')
     
-    def _get_timestamp(self) -> str:
+    def _get_timestamp(self, now: datetime) -> str:
         """获取Unix时间戳"""
-        return str(int(time.time()))
+        return str(int(now.timestamp()))
     
-    def _get_weekday(self) -> str:
+    def _get_weekday(self, now: datetime) -> str:
         """获取星期几"""
-        weekdays = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
-        return weekdays[datetime.now().weekday()]
+        return self.WEEKDAYS[now.weekday()]
     
-    def _get_year(self) -> str:
+    def _get_year(self, now: datetime) -> str:
         """获取当前年份"""
-        return str(datetime.now().year)
+        return str(now.year)
     
-    def _get_month(self) -> str:
+    def _get_month(self, now: datetime) -> str:
         """获取当前月份"""
-        return str(datetime.now().month)
+        return str(now.month)
     
-    def _get_day(self) -> str:
+    def _get_day(self, now: datetime) -> str:
         """获取当前日期"""
-        return str(datetime.now().day)
+        return str(now.day)
     
     def process(self, text: str) -> str:
         """处理文本中的模板变量
@@ -71,26 +97,33 @@ class TemplateProcessor:
         Returns:
             处理后的文本，模板变量已被替换为实际值
         """
-        if not text:
+        if not text or '{{' not in text:
+            # 不含模板变量时无需正则替换
             return text
         
-        def replace_variable(match):
-            """替换单个模板变量"""
-            var_name = match.group(1).lower()
-            if var_name in self.variables:
+        literals, variables = _split_template(text)
+        if not variables:
+            return text
+        
+        # 按预先切分的结构拼接，变量值每次调用时重新获取；整个模板共用一次取得的当前时间
+        now = datetime.now()
+        parts = [literals[0]]
+        for (var_name, raw), literal in zip(variables, literals[1:]):
+            func = self.variables.get(var_name)
+            if func is None:
+                # 未知的模板变量，返回原始文本
+                print(f"警告: 未知的模板变量 '{var_name}'")
+                parts.append(raw)
+            else:
                 try:
-                    return self.variables[var_name]()
+                    parts.append(func(now))
                 except Exception as e:
                     # 如果获取变量值失败，返回原始模板变量
                     print(f"警告: 获取模板变量 '{var_name}' 失败: {e}")
-                    return match.group(0)
-            else:
-                # 未知的模板变量，返回原始文本
-                print(f"警告: 未知的模板变量 '{var_name}'")
-                return match.group(0)
+                    parts.append(raw)
+            parts.append(literal)
         
-        # 替换所有模板变量
-        return self.pattern.sub(replace_variable, text)
+        return "".join(parts)
     
     def get_available_variables(self) -> list:
         """获取所有可用的模板变量列表"""
@@ -103,7 +136,7 @@ class TemplateProcessor:
             name: 变量名
             func: 返回变量值的函数
         """
-        self.variables[name.lower()] = func
+        self.variables[name.lower()] = lambda now: func()
 
 # 全局模板处理器实例
 _template_processor = TemplateProcessor()
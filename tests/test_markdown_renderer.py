@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown渲染模块测试
+验证纯文本快速路径（Text）与Markdown渲染的输出完全一致
+"""
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.text import Text
+
+from markdown_renderer import _to_renderable
+
+
+def capture(renderable, width: int) -> str:
+    """在指定宽度下渲染Panel并返回纯文本输出"""
+    console = Console(width=width, file=io.StringIO(), record=True, color_system=None)
+    console.print(Panel(renderable))
+    return console.export_text()
+
+
+class ToRenderableTest(unittest.TestCase):
+    """_to_renderable 快速路径测试"""
+
+    # 走快速路径的文本：渲染结果必须与Markdown一致
+    PLAIN_SAMPLES = [
+        "plain",
+        "Hello there, how are you today? This sentence is long enough to wrap.",
+        "Para one.\n\nPara two, a bit longer so that it wraps across lines.",
+        "a  b   c\td",
+        "你好，这是一个很长的中文句子，用于测试换行效果是否一致。",
+        "price 3.5 ok, see http://example.com/path",
+        "Emoji 😀 and :smile: codes",
+    ]
+
+    # 渲染结果与纯文本不同的文本：必须交给Markdown
+    MARKDOWN_SAMPLES = [
+        "",
+        "line one\nline two",
+        "a\n\n\nb",
+        "Intro\n\n    code\n\nEnd",
+        "a &amp; b",
+        " leading space",
+        "trailing space ",
+        "\nleading newline",
+        "trailing newline\n",
+        "1. one",
+        "2) two",
+        "use **bold**",
+        "a - b",
+        "<b>html</b>",
+    ]
+
+    def test_plain_text_uses_text(self):
+        for sample in self.PLAIN_SAMPLES:
+            with self.subTest(sample=sample):
+                self.assertIsInstance(_to_renderable(sample), Text)
+
+    def test_plain_text_matches_markdown_output(self):
+        for sample in self.PLAIN_SAMPLES:
+            for width in (12, 30, 80):
+                with self.subTest(sample=sample, width=width):
+                    self.assertEqual(capture(Text(sample), width), capture(Markdown(sample), width))
+
+    def test_other_text_uses_markdown(self):
+        for sample in self.MARKDOWN_SAMPLES:
+            with self.subTest(sample=sample):
+                self.assertIsInstance(_to_renderable(sample), Markdown)
+
+
+if __name__ == "__main__":
+    unittest.main()